@@ -0,0 +1,137 @@
+"""
+Persistent TTL cache for Spotify catalog responses.
+
+Related artists, top tracks, albums and artist search results change
+slowly (days), so repeat scans can reuse them instead of paying a round
+trip and a slot in Spotify's rate limit. Only catalog endpoints are
+cached - nothing user-specific (top artists/tracks) is stored here.
+
+The database is opened (and its table created) on first use, and the
+async cached() wrapper runs its sqlite work in a worker thread so the
+event loop keeps serving the rest of the Spotify fan-out meanwhile.
+"""
+import asyncio
+import sqlite3
+import os
+import orjson
+import threading
+import time
+import functools
+from typing import Optional
+from contextlib import contextmanager
+
+CACHE_PATH = os.getenv("SPOTIFY_CACHE_PATH", os.path.join(os.path.dirname(__file__), "spotify_cache.db"))
+
+# One long-lived connection shared by all calls (opened on first use), as in
+# database.py: lookups run inside the scan's Spotify fan-out, so they must not
+# each pay a connect. Access is serialized (across the worker threads that
+# cached() uses) since connections aren't safe for concurrent use.
+_conn: Optional[sqlite3.Connection] = None
+_conn_path: Optional[str] = None
+_conn_lock = threading.RLock()
+
+# Expired rows are deleted at most this often (seconds), on write
+PURGE_INTERVAL = 3600
+_next_purge = 0.0
+
+
+def init_cache():
+    """
+    Open the cache database and drop expired rows. Optional: the table is
+    created on first use anyway.
+    """
+    purge_expired()
+
+
+def _open_connection(path: str) -> sqlite3.Connection:
+    """Open the cache database, creating its table if needed."""
+    conn = sqlite3.connect(path, check_same_thread=False)
+    # WAL + synchronous=NORMAL: commits don't fsync (only checkpoints do)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS response_cache (
+            key TEXT PRIMARY KEY,
+            value BLOB NOT NULL,
+            expires_at REAL NOT NULL
+        )
+    """)
+    conn.commit()
+    return conn
+
+
+@contextmanager
+def get_connection():
+    """
+    Get the shared cache database connection.
+
+    Reopens if CACHE_PATH has changed (e.g. tests pointing at a temp file).
+    Anything left uncommitted when the block exits is rolled back.
+    """
+    global _conn, _conn_path
+    with _conn_lock:
+        if _conn is None or _conn_path != CACHE_PATH:
+            if _conn is not None:
+                _conn.close()
+            _conn = _open_connection(CACHE_PATH)
+            _conn_path = CACHE_PATH
+        try:
+            yield _conn
+        finally:
+            if _conn.in_transaction:
+                _conn.rollback()
+
+
+def get_cached(key: str) -> Optional[dict]:
+    """Return the cached response for key, or None if missing/expired."""
+    with get_connection() as conn:
+        row = conn.execute("""
+            SELECT value FROM response_cache
+            WHERE key = ? AND expires_at > ?
+        """, (key, time.time())).fetchone()
+    return orjson.loads(row[0]) if row else None
+
+
+def set_cached(key: str, value: dict, ttl: float):
+    """Store a response under key for ttl seconds."""
+    now = time.time()
+    with get_connection() as conn:
+        conn.execute("""
+            INSERT OR REPLACE INTO response_cache (key, value, expires_at)
+            VALUES (?, ?, ?)
+        """, (key, orjson.dumps(value), now + ttl))
+        conn.commit()
+    if now >= _next_purge:
+        purge_expired()
+
+
+def purge_expired() -> int:
+    """Delete expired responses so the cache file doesn't grow forever."""
+    global _next_purge
+    now = time.time()
+    _next_purge = now + PURGE_INTERVAL
+    with get_connection() as conn:
+        cursor = conn.execute("""
+            DELETE FROM response_cache WHERE expires_at <= ?
+        """, (now,))
+        conn.commit()
+        return cursor.rowcount
+
+
+def cached(ttl: float):
+    """
+    Cache an async SpotifyClient method's response by method name + arguments.
+    The client instance (and its access token) is not part of the key.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        async def wrapper(self, *args, **kwargs):
+            key = f"{method.__name__}:{args!r}:{sorted(kwargs.items())!r}"
+            hit = await asyncio.to_thread(get_cached, key)
+            if hit is not None:
+                return hit
+            value = await method(self, *args, **kwargs)
+            await asyncio.to_thread(set_cached, key, value, ttl)
+            return value
+        return wrapper
+    return decorator
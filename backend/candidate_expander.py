@@ -8,14 +8,19 @@ Key constraint: A candidate must appear as related to at least 2
 different recurring seed artists to be eligible. This ensures
 structural omission, not random adjacency.
 """
+import asyncio
+import heapq
+import logging
 from dataclasses import dataclass, field
-from typing import Optional
+from typing import AbstractSet, Optional
 from spotify_client import SpotifyClient
 from context_builder import UserContext
-from config import RECENCY_CUTOFF_YEAR, MIN_SEED_SUPPORT
+from config import RECENCY_CUTOFF_YEAR, MIN_SEED_SUPPORT, SPOTIFY_MAX_CONCURRENCY
 
+log = logging.getLogger(__name__)
 
-@dataclass
+
+@dataclass(slots=True)
 class CandidateArtist:
     """A candidate artist for potential recommendation."""
     id: str
@@ -42,6 +47,26 @@ class CandidateArtist:
     seed_support_count: int = 0
 
 
+@dataclass
+class GenreIndex:
+    """
+    Lookup tables over a user's genre profile, built once per expansion.
+
+    Partial matches are token-aligned: "rock" matches "indie rock" in
+    either direction. Each entry keeps the rank of the first user genre
+    it came from, so lookups honour the profile's iteration order.
+    """
+    weights: dict[str, float]
+    # Normalised user genre -> (rank, weight)
+    genres: dict[str, tuple[int, float]] = field(default_factory=dict)
+    # Any contiguous token run of a user genre -> (rank, weight)
+    runs: dict[str, tuple[int, float]] = field(default_factory=dict)
+    # Candidate genre -> resolved partial match, filled lazily
+    matches: dict[str, Optional[tuple[int, float]]] = field(default_factory=dict)
+    # Candidate genre list (as a tuple) -> overlap score, filled lazily
+    overlaps: dict[tuple[str, ...], float] = field(default_factory=dict)
+
+
 async def expand_candidates(
     client: SpotifyClient,
     context: UserContext,
@@ -61,80 +86,100 @@ async def expand_candidates(
     6. Score by genre overlap
     """
     # Track candidates and their seed support
-    candidate_support: dict[str, dict] = {}  # artist_id -> {data, seed_ids, seed_names}
+    candidate_support: dict[str, dict] = {}  # artist_id -> {data, seeds: {seed_id: seed_name}}
+
+    # Genre lookup tables shared by every candidate in this expansion
+    genre_index = build_genre_index(context.genre_weights)
+
+    # Hashed membership for the exposure filter (a set or dict keys view)
+    known = context.known_artist_ids
 
     # Use recurring artists as seeds (these are the user's stable preferences)
     seed_artist_ids = context.recurring_artist_ids
 
     # If not enough recurring artists, use top artists by position
     if len(seed_artist_ids) < 5:
-        sorted_artists = sorted(
+        top_artists = heapq.nsmallest(
+            10,
             context.artists.values(),
             key=lambda a: a.position_avg
         )
-        seed_artist_ids = [a.id for a in sorted_artists[:10]]
+        seed_artist_ids = [a.id for a in top_artists]
 
-    print(f"[expand] Using {len(seed_artist_ids)} seed artists")
+    log.info("Using %d seed artists", len(seed_artist_ids))
+
+    # Dynamic threshold: if few recurring artists, accept 1+ seed support
+    effective_min_support = MIN_SEED_SUPPORT if len(seed_artist_ids) >= 3 else 1
 
     # =========================================================================
-    # STEP 1: Get related artists for each seed
+    # STEP 1: Get related artists for each seed (concurrently; the client
+    # rate-limits every request)
     # =========================================================================
-    for seed_id in seed_artist_ids[:15]:  # Limit API calls
-        seed_artist = context.artists.get(seed_id)
-        seed_name = seed_artist.name if seed_artist else "Unknown"
+    seed_pool = seed_artist_ids[:15]  # Limit API calls
+
+    # Candidates that have reached effective_min_support, tracked as they cross it
+    supported_count = 0
+
+    # Fetch in waves so we can stop issuing requests once there are plenty
+    # of structurally supported candidates
+    for start in range(0, len(seed_pool), SPOTIFY_MAX_CONCURRENCY):
+        wave = seed_pool[start:start + SPOTIFY_MAX_CONCURRENCY]
+        responses = await asyncio.gather(
+            *[client.get_related_artists(seed_id) for seed_id in wave],
+            return_exceptions=True
+        )
 
-        try:
-            related = await client.get_related_artists(seed_id)
-            related_artists = related.get("artists", [])
+        # Merge sequentially once the wave is in (no shared-state races)
+        for seed_id, related in zip(wave, responses):
+            if isinstance(related, Exception):
+                log.warning("Related artists failed for %s: %s", seed_id, related)
+                continue
 
-            for artist in related_artists:
+            seed_artist = context.artists.get(seed_id)
+            seed_name = seed_artist.name if seed_artist else "Unknown"
+
+            for artist in related.get("artists", []):
                 artist_id = artist.get("id")
-                if not artist_id:
-                    continue
 
-                # Skip known artists
-                if artist_id in context.known_artist_ids:
+                # Skip malformed entries and known artists
+                if not artist_id or artist_id in known:
                     continue
 
                 # Initialize or update candidate support
-                if artist_id not in candidate_support:
+                data = candidate_support.get(artist_id)
+                if data is None:
                     popularity = artist.get("popularity", 0)
 
                     # Skip if outside popularity range
                     if popularity < min_popularity or popularity > max_popularity:
                         continue
 
-                    artist_genres = artist.get("genres", [])
-
-                    candidate_support[artist_id] = {
+                    data = candidate_support[artist_id] = {
                         "id": artist_id,
                         "name": artist.get("name", "Unknown"),
-                        "genres": artist_genres,
+                        "genres": artist.get("genres", []),
                         "popularity": popularity,
-                        "genre_overlap": _compute_genre_overlap(artist_genres, context.genre_weights),
-                        "seed_ids": [],
-                        "seed_names": [],
+                        "seeds": {},  # insertion-ordered, O(1) dedup
                     }
 
                 # Add this seed as support
-                if seed_id not in candidate_support[artist_id]["seed_ids"]:
-                    candidate_support[artist_id]["seed_ids"].append(seed_id)
-                    candidate_support[artist_id]["seed_names"].append(seed_name)
-
-        except Exception as e:
-            print(f"[expand] Related artists failed for {seed_id}: {e}")
-            continue
+                seeds = data["seeds"]
+                if seed_id not in seeds:
+                    seeds[seed_id] = seed_name
+                    if len(seeds) == effective_min_support:
+                        supported_count += 1
+
+        if supported_count >= max_candidates * 2:
+            log.info("%d supported candidates, skipping remaining seeds", supported_count)
+            break
 
     # =========================================================================
     # STEP 2: Filter to candidates with seed support (STRUCTURAL OMISSION)
     # =========================================================================
     candidates: list[CandidateArtist] = []
 
-    # Dynamic threshold: if few recurring artists, accept 1+ seed support
-    effective_min_support = MIN_SEED_SUPPORT if len(seed_artist_ids) >= 3 else 1
-
     for artist_id, data in candidate_support.items():
-        seed_count = len(data["seed_ids"])
+        seed_count = len(data["seeds"])
 
         # REQUIRE: at least effective_min_support seeds must link to this candidate
         if seed_count < effective_min_support:
@@ -146,22 +191,31 @@ async def expand_candidates(
             genres=data["genres"],
             popularity=data["popularity"],
             source="related_artist",
-            genre_overlap=data["genre_overlap"],
-            seed_artist_ids=data["seed_ids"],
-            seed_artist_names=data["seed_names"],
+            # Scored only for survivors: most related artists never reach
+            # the seed-support threshold
+            genre_overlap=_compute_genre_overlap(
+                data["genres"], context.genre_weights, genre_index
+            ),
+            seed_artist_ids=list(data["seeds"]),
+            seed_artist_names=list(data["seeds"].values()),
             seed_support_count=seed_count,
         ))
 
-    print(f"[expand] {len(candidate_support)} candidates found, {len(candidates)} have {effective_min_support}+ seed support")
+    log.info(
+        "%d candidates found, %d have %d+ seed support",
+        len(candidate_support), len(candidates), effective_min_support
+    )
 
     # =========================================================================
     # STEP 3: If insufficient candidates, fall back to genre search
     # =========================================================================
     if len(candidates) < 10:
-        print("[expand] Insufficient related candidates, trying genre search...")
+        log.info("Insufficient related candidates, trying genre search...")
         genre_candidates = await _expand_by_genre(
             client, context,
-            existing_ids=set(c.id for c in candidates),
+            known=known,
+            existing_ids={c.id for c in candidates},
+            genre_index=genre_index,
             min_popularity=min_popularity,
             max_popularity=max_popularity,
             limit=max_candidates - len(candidates)
@@ -171,53 +225,79 @@ async def expand_candidates(
     # =========================================================================
     # STEP 4: Sort by seed support * genre overlap, then fetch details
     # =========================================================================
-    candidates.sort(
-        key=lambda c: (c.seed_support_count * c.genre_overlap),
-        reverse=True
+    # Partial selection: only the top max_candidates need ordering
+    top_candidates = heapq.nlargest(
+        max_candidates,
+        candidates,
+        key=lambda c: c.seed_support_count * c.genre_overlap
     )
 
-    # Limit to top candidates
-    top_candidates = candidates[:max_candidates]
+    # Fetch sample tracks (and release years) for top candidates in one
+    # concurrent pass; albums are only requested for the top 20. The
+    # client's shared rate limiter bounds how many requests are in flight.
+    await asyncio.gather(*[
+        _enrich_candidate(client, candidate, with_albums=i < 20)
+        for i, candidate in enumerate(top_candidates[:30])
+    ])
 
-    # Fetch sample tracks for top candidates
-    for candidate in top_candidates[:30]:
-        try:
-            top_tracks = await client.get_artist_top_tracks(candidate.id)
-            tracks = top_tracks.get("tracks", [])
-            if tracks:
-                candidate.sample_track_id = tracks[0].get("id")
-                candidate.sample_track_name = tracks[0].get("name")
-        except Exception:
-            continue
+    log.info("Final candidates: %d", len(top_candidates))
+    return top_candidates
 
-    # Fetch album years for recency scoring
-    for candidate in top_candidates[:20]:
-        try:
-            albums = await client.get_artist_albums(candidate.id, limit=5)
-            album_items = albums.get("items", [])
-
-            years = []
-            for album in album_items:
-                release_date = album.get("release_date", "")
-                if release_date:
-                    try:
-                        year = int(release_date[:4])
-                        years.append(year)
-                    except ValueError:
-                        continue
-            if years:
-                candidate.earliest_release_year = min(years)
-        except Exception:
-            continue
 
-    print(f"[expand] Final candidates: {len(top_candidates)}")
-    return top_candidates
+async def _enrich_candidate(
+    client: SpotifyClient,
+    candidate: CandidateArtist,
+    with_albums: bool
+) -> None:
+    """
+    Fill in sample track and earliest release year for one candidate.
+
+    Each top track embeds its album (with release_date), so one call
+    usually covers recency; the albums endpoint is a fallback for
+    candidates whose top tracks carried no dates.
+    """
+    try:
+        top_tracks = await client.get_artist_top_tracks(candidate.id)
+    except Exception:
+        top_tracks = {}
+
+    tracks = top_tracks.get("tracks", [])
+    if tracks:
+        candidate.sample_track_id = tracks[0].get("id")
+        candidate.sample_track_name = tracks[0].get("name")
+    candidate.earliest_release_year = _earliest_release_year(
+        [t.get("album") or {} for t in tracks]
+    )
+
+    if candidate.earliest_release_year is not None or not with_albums:
+        return
+
+    try:
+        albums = await client.get_artist_albums(candidate.id, limit=5)
+    except Exception:
+        return
+    candidate.earliest_release_year = _earliest_release_year(albums.get("items", []))
+
+
+def _earliest_release_year(album_items: list[dict]) -> Optional[int]:
+    """Earliest release year across an artist's albums, or None if unknown."""
+    years = []
+    for album in album_items:
+        release_date = album.get("release_date", "")
+        if release_date:
+            try:
+                years.append(int(release_date[:4]))
+            except ValueError:
+                continue
+    return min(years) if years else None
 
 
 async def _expand_by_genre(
     client: SpotifyClient,
     context: UserContext,
+    known: AbstractSet[str],
     existing_ids: set[str],
+    genre_index: GenreIndex,
     min_popularity: int,
     max_popularity: int,
     limit: int
@@ -228,13 +308,7 @@ async def _expand_by_genre(
     """
     candidates = []
 
-    top_genres = sorted(
-        context.genre_weights.items(),
-        key=lambda x: x[1],
-        reverse=True
-    )[:5]
-
-    for genre, weight in top_genres:
+    for genre, weight in context.top_genres(5):
         if len(candidates) >= limit:
             break
 
@@ -248,9 +322,7 @@ async def _expand_by_genre(
                 if not artist_id:
                     continue
 
-                if artist_id in context.known_artist_ids:
-                    continue
-                if artist_id in existing_ids:
+                if artist_id in known or artist_id in existing_ids:
                     continue
 
                 popularity = artist.get("popularity", 0)
@@ -266,7 +338,9 @@ async def _expand_by_genre(
                     popularity=popularity,
                     source="genre_search",
                     source_genre=genre,
-                    genre_overlap=_compute_genre_overlap(artist_genres, context.genre_weights),
+                    genre_overlap=_compute_genre_overlap(
+                        artist_genres, context.genre_weights, genre_index
+                    ),
                     seed_support_count=0,  # No seed support for genre search
                 ))
 
@@ -276,15 +350,60 @@ async def _expand_by_genre(
                     break
 
         except Exception as e:
-            print(f"[expand] Genre search failed for '{genre}': {e}")
+            log.warning("Genre search failed for '%s': %s", genre, e)
             continue
 
     return candidates
 
 
+def _genre_tokens(genre: str) -> list[str]:
+    """Split a genre into words, treating hyphens as spaces ("post-punk" -> post, punk)."""
+    return genre.replace("-", " ").split()
+
+
+def _token_runs(tokens: list[str]) -> list[str]:
+    """All contiguous token runs: [indie, rock] -> indie, indie rock, rock."""
+    return [
+        " ".join(tokens[i:j])
+        for i in range(len(tokens))
+        for j in range(i + 1, len(tokens) + 1)
+    ]
+
+
+def build_genre_index(user_genre_weights: dict[str, float]) -> GenreIndex:
+    """Precompute the partial-match tables for a user's genre weights."""
+    index = GenreIndex(weights=user_genre_weights)
+    for rank, (user_genre, weight) in enumerate(user_genre_weights.items()):
+        tokens = _genre_tokens(user_genre)
+        index.genres.setdefault(" ".join(tokens), (rank, weight))
+        for run in _token_runs(tokens):
+            index.runs.setdefault(run, (rank, weight))
+    return index
+
+
+def _partial_genre_match(genre: str, index: GenreIndex) -> Optional[tuple[int, float]]:
+    """First user genre (by rank) that contains, or is contained in, this genre."""
+    # Related artists share genres heavily; resolve each distinct one once
+    if genre in index.matches:
+        return index.matches[genre]
+
+    tokens = _genre_tokens(genre)
+    # Candidate genre inside a user genre
+    best = index.runs.get(" ".join(tokens))
+    # User genre inside the candidate genre
+    for run in _token_runs(tokens):
+        hit = index.genres.get(run)
+        if hit is not None and (best is None or hit < best):
+            best = hit
+
+    index.matches[genre] = best
+    return best
+
+
 def _compute_genre_overlap(
     candidate_genres: list[str],
-    user_genre_weights: dict[str, float]
+    user_genre_weights: dict[str, float],
+    genre_index: Optional[GenreIndex] = None
 ) -> float:
     """
     Compute how much a candidate's genres overlap with user's genre profile.
@@ -293,17 +412,28 @@ def _compute_genre_overlap(
     if not candidate_genres or not user_genre_weights:
         return 0.0
 
+    if genre_index is None:
+        genre_index = build_genre_index(user_genre_weights)
+
+    # Related artists often share an identical genre list - score it once
+    key = tuple(candidate_genres)
+    cached = genre_index.overlaps.get(key)
+    if cached is not None:
+        return cached
+
     overlap_score = 0.0
     for genre in candidate_genres:
         # Direct match
-        if genre in user_genre_weights:
-            overlap_score += user_genre_weights[genre]
+        weight = user_genre_weights.get(genre)
+        if weight is not None:
+            overlap_score += weight
         else:
             # Partial match (e.g., "indie rock" matches "rock")
-            for user_genre, weight in user_genre_weights.items():
-                if genre in user_genre or user_genre in genre:
-                    overlap_score += weight * 0.5
-                    break
+            match = _partial_genre_match(genre, genre_index)
+            if match is not None:
+                overlap_score += match[1] * 0.5
 
     # Normalize by number of candidate genres
-    return min(1.0, overlap_score / max(len(candidate_genres), 1))
+    score = min(1.0, overlap_score / max(len(candidate_genres), 1))
+    genre_index.overlaps[key] = score
+    return score
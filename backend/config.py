@@ -3,9 +3,14 @@ Configuration for Latent Search backend.
 Load Spotify API credentials from environment variables.
 """
 import os
-from dotenv import load_dotenv
+from typing import NamedTuple
 
-load_dotenv()
+# .env is a development convenience; skip the import and disk read when
+# there's no file (or when LOAD_DOTENV=0, e.g. in production)
+_ENV_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".env")
+if os.environ.get("LOAD_DOTENV", "1") == "1" and os.path.exists(_ENV_PATH):
+    from dotenv import load_dotenv
+    load_dotenv(_ENV_PATH)
 
 # Spotify OAuth Configuration
 SPOTIFY_CLIENT_ID = os.getenv("SPOTIFY_CLIENT_ID", "")
@@ -17,6 +22,29 @@ SPOTIFY_AUTH_URL = "https://accounts.spotify.com/authorize"
 SPOTIFY_TOKEN_URL = "https://accounts.spotify.com/api/token"
 SPOTIFY_API_BASE = "https://api.spotify.com/v1"
 
+# Spotify rate limiting (shared by every SpotifyClient request)
+SPOTIFY_RATE_LIMIT = 10         # Requests per SPOTIFY_RATE_PERIOD
+SPOTIFY_RATE_PERIOD = 1.0       # Seconds
+SPOTIFY_MAX_CONCURRENCY = 4     # Max requests in flight
+SPOTIFY_MAX_RETRIES = 3         # Retries on 429 Too Many Requests
+SPOTIFY_MAX_RETRY_DELAY = 5.0   # Seconds; longer Retry-After waits fail the request instead
+SPOTIFY_HTTP_TIMEOUT = 10.0     # Seconds per request
+
+# How long catalog responses (related artists, top tracks, albums, search)
+# are cached on disk, in seconds
+SPOTIFY_CACHE_TTL = 86400
+
+# Conditional GETs: ETag + raw body remembered per (token, request) so
+# unchanged data comes back as a bodiless 304. Bounded by total body bytes.
+SPOTIFY_ETAG_TTL = 600
+SPOTIFY_ETAG_CACHE_BYTES = 8 * 1024 * 1024
+
+# How long a built user context is reused in memory (e.g. diagnosis -> scan),
+# in seconds, and how many are kept at once. Matches the ~2 minute cache
+# hint Spotify sends for user top-artist/track data.
+USER_CONTEXT_TTL = 120
+USER_CONTEXT_CACHE_SIZE = 256
+
 # Required Spotify Scopes
 SPOTIFY_SCOPES = [
     "user-top-read",           # Top artists and tracks
@@ -24,15 +52,27 @@ SPOTIFY_SCOPES = [
     "user-library-read",       # Saved tracks
 ]
 
+# Frontend origins allowed by CORS (Vite dev server, CRA-style fallback)
+CORS_ORIGINS = ("http://localhost:5173", "http://localhost:3000")
+
 # Algorithm Configuration
-# Weights for omission score calculation
-OMISSION_WEIGHTS = {
-    "contextual_similarity": 0.35,  # How well artist fits user's context
-    "exposure_penalty": 0.25,       # Penalize if user has heard them
-    "playlist_saturation": 0.15,    # Penalize playlist-dominant artists
-    "popularity_penalty": 0.15,     # Penalize popular artists
-    "recency_penalty": 0.10,        # Penalize recent releases
-}
+class OmissionWeights(NamedTuple):
+    """Weights for omission score calculation (must sum to 1.0)."""
+    contextual_similarity: float  # How well artist fits user's context
+    exposure_penalty: float       # Penalize if user has heard them
+    playlist_saturation: float    # Penalize playlist-dominant artists
+    popularity_penalty: float     # Penalize popular artists
+    recency_penalty: float        # Penalize recent releases
+
+
+OMISSION_WEIGHTS = OmissionWeights(
+    contextual_similarity=0.35,
+    exposure_penalty=0.25,
+    playlist_saturation=0.15,
+    popularity_penalty=0.15,
+    recency_penalty=0.10,
+)
+assert abs(sum(OMISSION_WEIGHTS) - 1.0) < 1e-9, "OMISSION_WEIGHTS must sum to 1.0"
 
 # Popularity threshold (0-100, lower = less popular = better)
 POPULARITY_CEILING = 60
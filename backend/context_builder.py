@@ -10,12 +10,26 @@ Key metrics:
 - Artists returned to after gaps
 - Collaborator networks
 """
+import asyncio
+import time
+import httpx
+from collections import Counter
 from dataclasses import dataclass, field
-from typing import Optional
-from spotify_client import SpotifyClient
+from operator import itemgetter
+from typing import KeysView, Optional
+from spotify_client import SpotifyClient, token_hash
+from config import USER_CONTEXT_TTL, USER_CONTEXT_CACHE_SIZE
 
+# Spotify time windows fetched for each time_range option
+_TIME_WINDOWS = {
+    "short": ("short",),
+    "medium": ("medium",),
+    "long": ("long",),
+    "all": ("short", "medium", "long"),
+}
 
-@dataclass
+
+@dataclass(slots=True)
 class AudioFeatureProfile:
     """Aggregated audio feature ranges from user's listening history."""
     tempo_range: tuple[float, float] = (0, 200)
@@ -36,7 +50,7 @@ class AudioFeatureProfile:
     loudness_center: float = -10
 
 
-@dataclass
+@dataclass(slots=True)
 class ArtistContext:
     """Context data for a single artist in user's history."""
     id: str
@@ -52,7 +66,7 @@ class ArtistContext:
     position_avg: float = 0.0      # Average position in top lists
 
 
-@dataclass
+@dataclass(slots=True)
 class UserContext:
     """
     Complete longitudinal context profile for a user.
@@ -73,8 +87,39 @@ class UserContext:
     # Track IDs the user has listened to (for exposure checking)
     known_track_ids: set[str] = field(default_factory=set)
 
-    # Artist IDs the user has listened to
-    known_artist_ids: set[str] = field(default_factory=set)
+    # Artist IDs the user has listened to (a live view of artists' keys once built)
+    known_artist_ids: KeysView[str] | set[str] = field(default_factory=set)
+
+    # genre_weights sorted heaviest first, filled on first top_genres() call
+    _sorted_genres: Optional[list[tuple[str, float]]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    # One-line summary for scan responses, filled on first diagnosis_summary() call
+    _summary: Optional[str] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    def top_genres(self, n: int) -> list[tuple[str, float]]:
+        """
+        The n heaviest (genre, weight) pairs, heaviest first. Sorted once
+        and reused - contexts are read-only once built.
+        """
+        if self._sorted_genres is None:
+            self._sorted_genres = sorted(
+                self.genre_weights.items(), key=itemgetter(1), reverse=True
+            )
+        return self._sorted_genres[:n]
+
+    def diagnosis_summary(self) -> str:
+        """
+        One-line summary of the context. Built once - cached contexts are
+        reused across requests (e.g. repeated scans).
+        """
+        if self._summary is None:
+            genre_str = ", ".join([g[0] for g in self.top_genres(3)])
+            self._summary = f"Based on {len(self.artists)} artists, {len(self.recurring_artist_ids)} recurring. Top genres: {genre_str}."
+        return self._summary
 
 
 async def build_user_context(client: SpotifyClient, time_range: str = "all") -> UserContext:
@@ -88,82 +133,56 @@ async def build_user_context(client: SpotifyClient, time_range: str = "all") ->
     context = UserContext()
 
     # =========================================================================
-    # STEP 1: Fetch top artists based on selected time window(s)
+    # STEP 1: Fetch top artists and tracks for the selected time window(s)
     # =========================================================================
-    if time_range == "short":
-        short_artists = await client.get_top_artists("short_term", 50)
-        _process_artists(context, short_artists.get("items", []), "short")
-    elif time_range == "medium":
-        medium_artists = await client.get_top_artists("medium_term", 50)
-        _process_artists(context, medium_artists.get("items", []), "medium")
-    elif time_range == "long":
-        long_artists = await client.get_top_artists("long_term", 50)
-        _process_artists(context, long_artists.get("items", []), "long")
-    else:  # "all"
-        short_artists = await client.get_top_artists("short_term", 50)
-        medium_artists = await client.get_top_artists("medium_term", 50)
-        long_artists = await client.get_top_artists("long_term", 50)
-        _process_artists(context, short_artists.get("items", []), "short")
-        _process_artists(context, medium_artists.get("items", []), "medium")
-        _process_artists(context, long_artists.get("items", []), "long")
+    # The per-window requests are independent, so issue them all at once
+    windows = _TIME_WINDOWS.get(time_range, _TIME_WINDOWS["all"])
+    responses = await asyncio.gather(
+        *[client.get_top_artists(f"{window}_term", 50) for window in windows],
+        *[client.get_top_tracks(f"{window}_term", 50) for window in windows],
+    )
+    artist_responses = responses[:len(windows)]
+    track_responses = responses[len(windows):]
+
+    for window, top_artists in zip(windows, artist_responses):
+        _process_artists(context, top_artists.get("items", []), window)
 
     # =========================================================================
     # STEP 2: Identify recurring artists (appear in 2+ time windows)
     # =========================================================================
+    add_recurring = context.recurring_artist_ids.append
     for artist_id, artist_ctx in context.artists.items():
-        windows_present = sum([
-            artist_ctx.in_short_term,
-            artist_ctx.in_medium_term,
-            artist_ctx.in_long_term
-        ])
+        # bools add as ints
+        windows_present = (
+            artist_ctx.in_short_term
+            + artist_ctx.in_medium_term
+            + artist_ctx.in_long_term
+        )
         artist_ctx.recurrence_score = windows_present / 3.0
 
         if windows_present >= 2:
-            context.recurring_artist_ids.append(artist_id)
+            add_recurring(artist_id)
 
-    context.known_artist_ids = set(context.artists.keys())
+    # O(1) membership without copying the keys into a new set
+    context.known_artist_ids = context.artists.keys()
 
     # =========================================================================
-    # STEP 3: Fetch top tracks and audio features
+    # STEP 3: Collect top tracks
     # =========================================================================
     all_tracks = []
-    if time_range == "short":
-        short_tracks = await client.get_top_tracks("short_term", 50)
-        all_tracks.extend(short_tracks.get("items", []))
-    elif time_range == "medium":
-        medium_tracks = await client.get_top_tracks("medium_term", 50)
-        all_tracks.extend(medium_tracks.get("items", []))
-    elif time_range == "long":
-        long_tracks = await client.get_top_tracks("long_term", 50)
-        all_tracks.extend(long_tracks.get("items", []))
-    else:  # "all"
-        short_tracks = await client.get_top_tracks("short_term", 50)
-        medium_tracks = await client.get_top_tracks("medium_term", 50)
-        long_tracks = await client.get_top_tracks("long_term", 50)
-        all_tracks.extend(short_tracks.get("items", []))
-        all_tracks.extend(medium_tracks.get("items", []))
-        all_tracks.extend(long_tracks.get("items", []))
-
-    # Deduplicate tracks
-    track_ids = list({t["id"] for t in all_tracks if t.get("id")})
+    for top_tracks in track_responses:
+        all_tracks.extend(top_tracks.get("items", []))
+
+    # Deduplicate tracks, keeping first-seen order so audio-feature batches
+    # (and their cache keys) are the same from run to run
+    track_ids = list(dict.fromkeys(t["id"] for t in all_tracks if t.get("id")))
     context.known_track_ids = set(track_ids)
 
     # =========================================================================
     # STEP 4: Build audio feature profile (optional - may fail for new apps)
     # =========================================================================
-    if track_ids:
-        try:
-            all_features = []
-            for i in range(0, len(track_ids), 100):
-                batch = track_ids[i:i+100]
-                features_response = await client.get_audio_features(batch)
-                features = features_response.get("audio_features", [])
-                all_features.extend([f for f in features if f])
-            context.audio_profile = _compute_audio_profile(all_features)
-        except Exception:
-            # Audio features API may be restricted for new apps
-            # Continue without audio features - use genre matching only
-            pass
+    if track_ids and not _audio_features_disabled:
+        context.audio_profile = await _fetch_audio_profile(client, track_ids)
 
     # =========================================================================
     # STEP 5: Compute genre weights
@@ -173,6 +192,96 @@ async def build_user_context(client: SpotifyClient, time_range: str = "all") ->
     return context
 
 
+# Recently built contexts: (token hash, time_range) -> (built_at, context).
+# Insertion order doubles as age order for eviction. Keys hash the access
+# token so raw tokens aren't kept around in memory.
+_context_cache: dict[tuple[str, str], tuple[float, UserContext]] = {}
+# Per-key build locks: key -> [lock, requests holding or waiting on it].
+# An entry is dropped as soon as its last request leaves, built or not.
+_context_locks: dict[tuple[str, str], list] = {}
+
+
+async def get_user_context(client: SpotifyClient, time_range: str = "all") -> UserContext:
+    """
+    build_user_context, reusing a context built for the same access token
+    and time range within the last USER_CONTEXT_TTL seconds (e.g. the
+    diagnosis that precedes a scan). Concurrent requests for the same key
+    share one build. The returned context is shared - treat it as read-only.
+    """
+    key = (token_hash(client.access_token), time_range)
+    entry = _context_locks.get(key)
+    if entry is None:
+        entry = _context_locks[key] = [asyncio.Lock(), 0]
+    entry[1] += 1
+
+    try:
+        async with entry[0]:
+            hit = _context_cache.get(key)
+            if hit is not None and time.monotonic() - hit[0] < USER_CONTEXT_TTL:
+                return hit[1]
+
+            context = await build_user_context(client, time_range)
+            _store_context(key, context)
+            return context
+    finally:
+        entry[1] -= 1
+        if not entry[1]:
+            del _context_locks[key]
+
+
+def invalidate_user_context(access_token: str) -> None:
+    """Drop cached contexts for an access token (forces a fresh build)."""
+    token_key = token_hash(access_token)
+    for key in [k for k in _context_cache if k[0] == token_key]:
+        del _context_cache[key]
+
+
+def _store_context(key: tuple[str, str], context: UserContext) -> None:
+    """Cache a context, evicting expired and then oldest entries."""
+    now = time.monotonic()
+    _context_cache.pop(key, None)
+    _context_cache[key] = (now, context)
+
+    for old_key, (built_at, _) in list(_context_cache.items()):
+        if now - built_at < USER_CONTEXT_TTL and len(_context_cache) <= USER_CONTEXT_CACHE_SIZE:
+            break
+        del _context_cache[old_key]
+
+
+# Set once Spotify answers 403 for audio features (restricted for new apps):
+# later contexts skip those requests instead of failing them again
+_audio_features_disabled = False
+
+
+async def _fetch_audio_profile(client: SpotifyClient, track_ids: list[str]) -> AudioFeatureProfile:
+    """
+    Fetch audio features in batches of 100 (API max) and aggregate them.
+    Falls back to the default profile if the endpoint fails - scoring then
+    relies on genre matching only.
+    """
+    global _audio_features_disabled
+
+    batches = [track_ids[i:i+100] for i in range(0, len(track_ids), 100)]
+    try:
+        # Probe with the first batch; a 403 means every batch would fail
+        responses = [await client.get_audio_features(batches[0])]
+        responses += await asyncio.gather(*[
+            client.get_audio_features(batch) for batch in batches[1:]
+        ])
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code == 403:
+            _audio_features_disabled = True
+        return AudioFeatureProfile()
+    except Exception:
+        return AudioFeatureProfile()
+
+    all_features = []
+    for features_response in responses:
+        features = features_response.get("audio_features", [])
+        all_features.extend([f for f in features if f])
+    return _compute_audio_profile(all_features)
+
+
 def _process_artists(
     context: UserContext,
     artists: list[dict],
@@ -210,46 +319,39 @@ def _process_artists(
             artist_ctx.position_avg = (artist_ctx.position_avg + position) / 2
 
 
+# Audio feature -> (fallback range, fallback center) when no track has it
+_AUDIO_FEATURE_DEFAULTS = {
+    "tempo": ((60, 180), 120),
+    "energy": ((0, 1), 0.5),
+    "danceability": ((0, 1), 0.5),
+    "valence": ((0, 1), 0.5),
+    "acousticness": ((0, 1), 0.5),
+    "instrumentalness": ((0, 1), 0.5),
+    "loudness": ((-60, 0), -10),
+}
+
+
 def _compute_audio_profile(features: list[dict]) -> AudioFeatureProfile:
     """Compute aggregated audio feature ranges and centers from track features."""
     if not features:
         return AudioFeatureProfile()
 
-    # Extract feature arrays
-    tempos = [f["tempo"] for f in features if f.get("tempo")]
-    energies = [f["energy"] for f in features if f.get("energy") is not None]
-    danceabilities = [f["danceability"] for f in features if f.get("danceability") is not None]
-    valences = [f["valence"] for f in features if f.get("valence") is not None]
-    acousticnesses = [f["acousticness"] for f in features if f.get("acousticness") is not None]
-    instrumentalnesses = [f["instrumentalness"] for f in features if f.get("instrumentalness") is not None]
-    loudnesses = [f["loudness"] for f in features if f.get("loudness") is not None]
-
-    def safe_range(values: list, default_min: float, default_max: float) -> tuple[float, float]:
-        if not values:
-            return (default_min, default_max)
-        return (min(values), max(values))
-
-    def safe_mean(values: list, default: float) -> float:
-        if not values:
-            return default
-        return sum(values) / len(values)
-
-    return AudioFeatureProfile(
-        tempo_range=safe_range(tempos, 60, 180),
-        energy_range=safe_range(energies, 0, 1),
-        danceability_range=safe_range(danceabilities, 0, 1),
-        valence_range=safe_range(valences, 0, 1),
-        acousticness_range=safe_range(acousticnesses, 0, 1),
-        instrumentalness_range=safe_range(instrumentalnesses, 0, 1),
-        loudness_range=safe_range(loudnesses, -60, 0),
-        tempo_center=safe_mean(tempos, 120),
-        energy_center=safe_mean(energies, 0.5),
-        danceability_center=safe_mean(danceabilities, 0.5),
-        valence_center=safe_mean(valences, 0.5),
-        acousticness_center=safe_mean(acousticnesses, 0.5),
-        instrumentalness_center=safe_mean(instrumentalnesses, 0.5),
-        loudness_center=safe_mean(loudnesses, -10),
-    )
+    fields = {}
+    for key, (default_range, default_center) in _AUDIO_FEATURE_DEFAULTS.items():
+        if key == "tempo":
+            # A tempo of 0 means Spotify couldn't detect one
+            values = [f[key] for f in features if f.get(key)]
+        else:
+            values = [v for f in features if (v := f.get(key)) is not None]
+
+        if values:
+            fields[f"{key}_range"] = (min(values), max(values))
+            fields[f"{key}_center"] = sum(values) / len(values)
+        else:
+            fields[f"{key}_range"] = default_range
+            fields[f"{key}_center"] = default_center
+
+    return AudioFeatureProfile(**fields)
 
 
 def _compute_genre_weights(artists: dict[str, ArtistContext]) -> dict[str, float]:
@@ -257,17 +359,17 @@ def _compute_genre_weights(artists: dict[str, ArtistContext]) -> dict[str, float
     Compute genre weights based on frequency across user's artists.
     More common genres get higher weights.
     """
-    genre_counts: dict[str, int] = {}
+    genre_counts: Counter[str] = Counter()
 
     for artist_ctx in artists.values():
         # Weight by recurrence score
         weight = 1 + artist_ctx.recurrence_score
         for genre in artist_ctx.genres:
-            genre_counts[genre] = genre_counts.get(genre, 0) + weight
+            genre_counts[genre] += weight
 
-    if not genre_counts:
+    max_count = max(genre_counts.values(), default=0)
+    if not max_count:
         return {}
 
     # Normalize to 0-1 range
-    max_count = max(genre_counts.values())
     return {genre: count / max_count for genre, count in genre_counts.items()}
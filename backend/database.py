@@ -8,17 +8,40 @@ Two types of feedback:
 import sqlite3
 import os
 import json
+import threading
+import functools
 from datetime import datetime
 from typing import Optional
 from contextlib import contextmanager
 
-DB_PATH = os.path.join(os.path.dirname(__file__), "latent_search.db")
+DB_PATH = os.getenv("LATENT_SEARCH_DB_PATH", os.path.join(os.path.dirname(__file__), "latent_search.db"))
+
+# One long-lived connection shared by all calls (opened on first use).
+# sqlite3 connections aren't safe for concurrent use, so access is serialized.
+_conn: Optional[sqlite3.Connection] = None
+_conn_path: Optional[str] = None
+_conn_lock = threading.RLock()
+
+# Views derived from the feedback table, cached against the database's
+# change stamp (see _change_stamp): name -> (stamp, result)
+_feedback_cache: dict[str, tuple] = {}
 
 # Feedback score adjustments
 ACCEPT_BOOST = 0.10   # Add to score for accepted artists
 REJECT_PENALTY = 0.15  # Subtract from score for rejected artists
 HARD_REJECT_COUNT = 2  # Exclude after this many rejections
 
+# Verdicts the feedback table accepts (matches its CHECK constraint)
+VALID_VERDICTS = frozenset({"accept", "reject"})
+
+
+# Created by init_db(); ANALYZE runs when any of them is missing
+_INDEXES = frozenset({
+    "idx_feedback_artist",
+    "idx_feedback_verdict_artist",
+    "idx_likes_user_created",
+})
+
 
 def init_db():
     """Initialize the database with required tables."""
@@ -31,6 +54,7 @@ def init_db():
                 artist_id TEXT NOT NULL,
                 artist_name TEXT,
                 genres TEXT,
+                genres_json TEXT,
                 popularity INTEGER,
                 source_genre TEXT,
                 omission_score REAL,
@@ -39,6 +63,21 @@ def init_db():
             )
         """)
 
+        # genres_json (a JSON array, counted with json_each) was added after
+        # genres (comma-joined, kept for get_user_likes) - backfill old rows
+        like_columns = {row["name"] for row in conn.execute("PRAGMA table_info(likes)")}
+        if "genres_json" not in like_columns:
+            conn.execute("ALTER TABLE likes ADD COLUMN genres_json TEXT")
+        missing = conn.execute("""
+            SELECT id, genres FROM likes WHERE genres_json IS NULL
+        """).fetchall()
+        conn.executemany("""
+            UPDATE likes SET genres_json = ? WHERE id = ?
+        """, [
+            (json.dumps([g.strip() for g in (row["genres"] or "").split(",") if g.strip()]), row["id"])
+            for row in missing
+        ])
+
         conn.execute("""
             CREATE TABLE IF NOT EXISTS search_history (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -65,30 +104,134 @@ def init_db():
             )
         """)
 
+        existing_indexes = {row["name"] for row in conn.execute("""
+            SELECT name FROM sqlite_master WHERE type = 'index'
+        """)}
+
         # Index for fast lookups
         conn.execute("""
             CREATE INDEX IF NOT EXISTS idx_feedback_artist
             ON feedback(candidate_artist_id)
         """)
 
+        # Covering index for exclusion lookups (WHERE verdict = 'reject'
+        # GROUP BY candidate_artist_id)
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_feedback_verdict_artist
+            ON feedback(verdict, candidate_artist_id)
+        """)
+
+        # Lets get_user_likes read a user's likes newest-first without sorting
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_likes_user_created
+            ON likes(user_id, created_at DESC)
+        """)
+
+        # Gather planner statistics once, when the indexes above are new, so
+        # they get picked - not on every start (ANALYZE scans every table)
+        if not _INDEXES <= existing_indexes:
+            conn.execute("ANALYZE")
+
         conn.commit()
 
 
+def _open_connection(path: str) -> sqlite3.Connection:
+    """Open a connection tuned for a long-lived, mostly-read workload."""
+    # Room for every statement in this module in the prepared-statement cache
+    conn = sqlite3.connect(path, check_same_thread=False, cached_statements=256)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-20000")  # ~20MB page cache
+    return conn
+
+
 @contextmanager
 def get_connection():
-    """Get a database connection."""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    try:
-        yield conn
-    finally:
-        conn.close()
+    """
+    Get the shared database connection.
+
+    Reopens if DB_PATH has changed (e.g. tests pointing at a temp file).
+    Anything left uncommitted when the block exits is rolled back, so a
+    failed write can't hold the write lock for later callers.
+    """
+    global _conn, _conn_path
+    with _conn_lock:
+        if _conn is None or _conn_path != DB_PATH:
+            if _conn is not None:
+                _conn.close()
+            _conn = _open_connection(DB_PATH)
+            _conn_path = DB_PATH
+            # Stamps are per connection - drop views cached against the old one
+            _feedback_cache.clear()
+        try:
+            yield _conn
+        finally:
+            if _conn.in_transaction:
+                _conn.rollback()
 
 
 # =========================================================================
 # FEEDBACK SYSTEM (NEW)
 # =========================================================================
 
+def _change_stamp(conn: sqlite3.Connection) -> tuple[int, int]:
+    """
+    Changes whenever the database does: total_changes counts this
+    connection's writes, data_version moves when any other connection
+    (another worker, a CLI import) commits.
+    """
+    return conn.total_changes, conn.execute("PRAGMA data_version").fetchone()[0]
+
+
+def _cached_until_feedback_changes(func):
+    """
+    Cache a feedback-derived view until the database is next written to,
+    by this process or any other.
+    The result is shared between callers - treat it as read-only.
+    """
+    @functools.wraps(func)
+    def wrapper():
+        with get_connection() as conn:
+            stamp = _change_stamp(conn)
+            hit = _feedback_cache.get(func.__name__)
+            if hit is not None and hit[0] == stamp:
+                return hit[1]
+            # Computed under the connection lock, so no write from this
+            # process lands between the stamp and the result
+            result = func()
+            _feedback_cache[func.__name__] = (stamp, result)
+            return result
+    return wrapper
+
+
+_INSERT_FEEDBACK = """
+    INSERT INTO feedback (
+        candidate_artist_id, verdict, seed_artists,
+        omission_score, context_snapshot_id
+    )
+    VALUES (?, ?, ?, ?, ?)
+"""
+
+
+def _feedback_row(
+    candidate_artist_id: str,
+    verdict: str,
+    seed_artists: list[str] = None,
+    omission_score: float = None,
+    context_snapshot_id: str = None
+) -> tuple:
+    """Bind parameters for one feedback INSERT."""
+    return (
+        candidate_artist_id,
+        verdict,
+        json.dumps(seed_artists) if seed_artists else None,
+        omission_score,
+        context_snapshot_id,
+    )
+
+
 def add_feedback(
     candidate_artist_id: str,
     verdict: str,
@@ -100,23 +243,14 @@ def add_feedback(
     Record feedback (accept/reject) for a candidate artist.
     Returns True if saved successfully.
     """
-    if verdict not in ('accept', 'reject'):
+    if verdict not in VALID_VERDICTS:
         return False
 
     with get_connection() as conn:
         try:
-            conn.execute("""
-                INSERT INTO feedback (
-                    candidate_artist_id, verdict, seed_artists,
-                    omission_score, context_snapshot_id
-                )
-                VALUES (?, ?, ?, ?, ?)
-            """, (
-                candidate_artist_id,
-                verdict,
-                json.dumps(seed_artists) if seed_artists else None,
-                omission_score,
-                context_snapshot_id,
+            conn.execute(_INSERT_FEEDBACK, _feedback_row(
+                candidate_artist_id, verdict, seed_artists,
+                omission_score, context_snapshot_id
             ))
             conn.commit()
             return True
@@ -125,6 +259,29 @@ def add_feedback(
             return False
 
 
+def add_feedback_bulk(rows: list[tuple]) -> int:
+    """
+    Record many feedback verdicts in one transaction.
+
+    Each row is (candidate_artist_id, verdict, seed_artists, omission_score,
+    context_snapshot_id), as for add_feedback(). Rows with an invalid
+    verdict are skipped. Returns the number of rows saved.
+    """
+    params = [_feedback_row(*row) for row in rows if row[1] in VALID_VERDICTS]
+    if not params:
+        return 0
+
+    with get_connection() as conn:
+        try:
+            with conn:
+                conn.executemany(_INSERT_FEEDBACK, params)
+            return len(params)
+        except Exception as e:
+            print(f"[db] Feedback save error: {e}")
+            return 0
+
+
+@_cached_until_feedback_changes
 def get_feedback_adjustments() -> dict[str, float]:
     """
     Get score adjustments based on feedback history.
@@ -134,37 +291,25 @@ def get_feedback_adjustments() -> dict[str, float]:
     - Negative for rejected artists
     - None (excluded) for artists rejected 2+ times
     """
-    adjustments = {}
-
     with get_connection() as conn:
-        # Count accepts and rejects per artist
+        # Per-artist adjustment computed in SQL; hard exclusion (rejected
+        # HARD_REJECT_COUNT+ times) maps to -999, zero adjustments are dropped
         cursor = conn.execute("""
             SELECT
                 candidate_artist_id,
-                SUM(CASE WHEN verdict = 'accept' THEN 1 ELSE 0 END) as accepts,
-                SUM(CASE WHEN verdict = 'reject' THEN 1 ELSE 0 END) as rejects
+                CASE
+                    WHEN SUM(verdict = 'reject') >= ? THEN -999
+                    ELSE SUM(verdict = 'accept') * ? - SUM(verdict = 'reject') * ?
+                END as adjustment
             FROM feedback
             GROUP BY candidate_artist_id
-        """)
+            HAVING adjustment != 0
+        """, (HARD_REJECT_COUNT, ACCEPT_BOOST, REJECT_PENALTY))
 
-        for row in cursor.fetchall():
-            artist_id = row["candidate_artist_id"]
-            accepts = row["accepts"] or 0
-            rejects = row["rejects"] or 0
-
-            # Hard exclusion: rejected 2+ times
-            if rejects >= HARD_REJECT_COUNT:
-                adjustments[artist_id] = -999  # Effectively exclude
-
-            else:
-                # Calculate adjustment
-                adjustment = (accepts * ACCEPT_BOOST) - (rejects * REJECT_PENALTY)
-                if adjustment != 0:
-                    adjustments[artist_id] = adjustment
-
-    return adjustments
+        return {artist_id: adjustment for artist_id, adjustment in cursor}
 
 
+@_cached_until_feedback_changes
 def get_excluded_artists() -> set[str]:
     """Get artist IDs that should be excluded (rejected 2+ times)."""
     excluded = set()
@@ -225,6 +370,31 @@ def get_feedback_stats() -> dict:
 # LEGACY LIKES SYSTEM
 # =========================================================================
 
+# Duplicate (user_id, artist_id) pairs are ignored rather than raising
+_INSERT_LIKE = """
+    INSERT OR IGNORE INTO likes (user_id, artist_id, artist_name, genres,
+                                 genres_json, popularity, source_genre,
+                                 omission_score)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def _like_row(
+    user_id: str,
+    artist_id: str,
+    artist_name: str,
+    genres: list[str],
+    popularity: int,
+    source_genre: Optional[str],
+    omission_score: float
+) -> tuple:
+    """Bind parameters for one likes INSERT."""
+    return (
+        user_id, artist_id, artist_name, ",".join(genres), json.dumps(genres),
+        popularity, source_genre, omission_score
+    )
+
+
 def add_like(
     user_id: str,
     artist_id: str,
@@ -234,19 +404,33 @@ def add_like(
     source_genre: Optional[str],
     omission_score: float
 ) -> bool:
-    """Add a like for an artist."""
+    """Add a like for an artist. Returns False if it was already liked."""
     with get_connection() as conn:
-        try:
-            conn.execute("""
-                INSERT INTO likes (user_id, artist_id, artist_name, genres,
-                                   popularity, source_genre, omission_score)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, (user_id, artist_id, artist_name, ",".join(genres),
-                  popularity, source_genre, omission_score))
-            conn.commit()
-            return True
-        except sqlite3.IntegrityError:
-            return False
+        cursor = conn.execute(_INSERT_LIKE, _like_row(
+            user_id, artist_id, artist_name, genres,
+            popularity, source_genre, omission_score
+        ))
+        conn.commit()
+        return cursor.rowcount > 0
+
+
+def add_likes_bulk(rows: list[tuple]) -> int:
+    """
+    Add many likes in one transaction.
+
+    Each row is (user_id, artist_id, artist_name, genres, popularity,
+    source_genre, omission_score), as for add_like(). Artists the user
+    already liked are skipped. Returns the number of likes added.
+    """
+    params = [_like_row(*row) for row in rows]
+    if not params:
+        return 0
+
+    with get_connection() as conn:
+        before = conn.total_changes
+        with conn:
+            conn.executemany(_INSERT_LIKE, params)
+        return conn.total_changes - before
 
 
 def remove_like(user_id: str, artist_id: str) -> bool:
@@ -294,17 +478,16 @@ def get_like_stats(user_id: str) -> dict:
         """, (user_id,))
         row = cursor.fetchone()
 
+        # Count genres across the user's likes in SQL
         cursor = conn.execute("""
-            SELECT genres FROM likes WHERE user_id = ?
+            SELECT g.value as genre, COUNT(*) as count
+            FROM likes, json_each(likes.genres_json) as g
+            WHERE likes.user_id = ?
+            GROUP BY genre
+            ORDER BY count DESC, genre
+            LIMIT 5
         """, (user_id,))
-
-        genre_counts: dict[str, int] = {}
-        for row_genres in cursor.fetchall():
-            if row_genres["genres"]:
-                for genre in row_genres["genres"].split(","):
-                    genre = genre.strip()
-                    if genre:
-                        genre_counts[genre] = genre_counts.get(genre, 0) + 1
+        top_genres = [(g["genre"], g["count"]) for g in cursor.fetchall()]
 
         return {
             "total_likes": row["total_likes"] or 0,
@@ -312,8 +495,7 @@ def get_like_stats(user_id: str) -> dict:
             "min_popularity": row["min_popularity"] or 0,
             "max_popularity": row["max_popularity"] or 0,
             "avg_omission_score": round(row["avg_omission_score"] or 0, 3),
-            "top_genres": sorted(genre_counts.items(),
-                                 key=lambda x: x[1], reverse=True)[:5]
+            "top_genres": top_genres,
         }
 
 
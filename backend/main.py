@@ -12,8 +12,13 @@ Flow:
 """
 from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from typing import Optional
+from contextlib import asynccontextmanager
+import asyncio
+import logging
+import sys
 import urllib.parse
 
 from config import (
@@ -21,25 +26,43 @@ from config import (
     SPOTIFY_AUTH_URL,
     SPOTIFY_REDIRECT_URI,
     SPOTIFY_SCOPES,
-    MAX_RESULTS
+    MAX_RESULTS,
+    CORS_ORIGINS,
 )
-from spotify_client import SpotifyClient, exchange_code_for_token
-from context_builder import build_user_context, UserContext
+from spotify_client import SpotifyClient, exchange_code_for_token, close_http_client
+from context_builder import get_user_context, invalidate_user_context, UserContext
 from candidate_expander import expand_candidates
 from omission_scorer import get_top_recommendations
 import database as db
 
+# Module loggers (e.g. candidate_expander) log at INFO; keep the old
+# "[module] message" console format for local runs
+logging.basicConfig(level=logging.INFO, format="[%(name)s] %(message)s")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Release pooled Spotify connections
+    await close_http_client()
+    # The scrapers' shared session only exists if something imported them -
+    # don't pull in the sources package just to close it
+    source_http = sys.modules.get("sources.http")
+    if source_http is not None:
+        await source_http.close_session()
+
 
 app = FastAPI(
     title="Latent Search",
     description="Diagnosis + Omission Scan instrument. Not a search tool.",
-    version="0.2.0"
+    version="0.2.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,  # orjson (already a dependency) encodes responses
 )
 
 # CORS for frontend
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["http://localhost:5173", "http://localhost:3000"],
+    allow_origins=CORS_ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
@@ -80,21 +103,26 @@ class GenreWeight(BaseModel):
     weight: float
 
 
+class AudioFeatureCenter(BaseModel):
+    """Central tendency of one audio feature."""
+    center: float
+
+
 class AudioFeatureStats(BaseModel):
     """Audio feature statistics from user's listening."""
-    energy: dict  # {mean, std, min, max}
-    danceability: dict
-    valence: dict
-    tempo: dict
-    acousticness: dict
-    instrumentalness: dict
+    energy: AudioFeatureCenter
+    danceability: AudioFeatureCenter
+    valence: AudioFeatureCenter
+    tempo: AudioFeatureCenter
+    acousticness: AudioFeatureCenter
+    instrumentalness: AudioFeatureCenter
 
 
 class DiagnosisResponse(BaseModel):
     """Complete diagnosis of user's listening profile."""
     recurring_artists: list[RecurringArtist]
     top_genres: list[GenreWeight]
-    audio_feature_profile: dict
+    audio_feature_profile: AudioFeatureStats
     notes: list[str]  # Template-based observations
     total_artists_analyzed: int
     total_tracks_analyzed: int
@@ -155,22 +183,26 @@ class FeedbackStatsResponse(BaseModel):
 # AUTH ENDPOINTS
 # =========================================================================
 
+# The authorize URL only depends on config, so build it once
+_AUTH_PARAMS = {
+    "client_id": SPOTIFY_CLIENT_ID,
+    "response_type": "code",
+    "redirect_uri": SPOTIFY_REDIRECT_URI,
+    "scope": " ".join(SPOTIFY_SCOPES),
+    "show_dialog": "true"
+}
+_AUTH_URL = (
+    f"{SPOTIFY_AUTH_URL}?{urllib.parse.urlencode(_AUTH_PARAMS)}"
+    if SPOTIFY_CLIENT_ID else None
+)
+
+
 @app.get("/auth/spotify/url", response_model=AuthUrlResponse)
 def get_spotify_auth_url():
     """Generate Spotify OAuth authorization URL."""
-    if not SPOTIFY_CLIENT_ID:
+    if _AUTH_URL is None:
         raise HTTPException(status_code=500, detail="Spotify client ID not configured")
-
-    params = {
-        "client_id": SPOTIFY_CLIENT_ID,
-        "response_type": "code",
-        "redirect_uri": SPOTIFY_REDIRECT_URI,
-        "scope": " ".join(SPOTIFY_SCOPES),
-        "show_dialog": "true"
-    }
-
-    auth_url = f"{SPOTIFY_AUTH_URL}?{urllib.parse.urlencode(params)}"
-    return AuthUrlResponse(auth_url=auth_url)
+    return AuthUrlResponse(auth_url=_AUTH_URL)
 
 
 @app.get("/auth/spotify/callback", response_model=TokenResponse)
@@ -193,7 +225,8 @@ async def spotify_callback(code: str = Query(...)):
 
 @app.get("/diagnosis", response_model=DiagnosisResponse)
 async def run_diagnosis(
-    access_token: str = Query(..., description="Spotify access token")
+    access_token: str = Query(..., description="Spotify access token"),
+    refresh: bool = Query(False, description="Rebuild the listening context instead of reusing a recent one"),
 ):
     """
     Run a diagnosis of the user's listening profile.
@@ -207,80 +240,100 @@ async def run_diagnosis(
     """
     try:
         client = SpotifyClient(access_token)
+        if refresh:
+            invalidate_user_context(access_token)
 
-        # Build full context across all time windows
-        context = await build_user_context(client, time_range="all")
-
-        # Format recurring artists
-        recurring_artists = []
-        for artist_id in context.recurring_artist_ids[:15]:
-            if artist_id in context.artists:
-                a = context.artists[artist_id]
-                recurring_artists.append(RecurringArtist(
-                    id=a.id,
-                    name=a.name,
-                    genres=a.genres[:5],
-                    popularity=a.popularity,
-                    in_short_term=a.in_short_term,
-                    in_medium_term=a.in_medium_term,
-                    in_long_term=a.in_long_term,
-                    recurrence_score=a.recurrence_score,
-                ))
-
-        # Format top genres
-        sorted_genres = sorted(
-            context.genre_weights.items(),
-            key=lambda x: x[1],
-            reverse=True
-        )[:10]
-        top_genres = [
-            GenreWeight(genre=g, weight=round(w, 3))
-            for g, w in sorted_genres
-        ]
-
-        # Format audio feature profile
-        ap = context.audio_profile
-        audio_profile = {
-            "energy": {"center": round(ap.energy_center, 3)},
-            "danceability": {"center": round(ap.danceability_center, 3)},
-            "valence": {"center": round(ap.valence_center, 3)},
-            "tempo": {"center": round(ap.tempo_center, 1)},
-            "acousticness": {"center": round(ap.acousticness_center, 3)},
-            "instrumentalness": {"center": round(ap.instrumentalness_center, 3)},
-        }
-
-        # Generate template-based notes
-        notes = _generate_diagnosis_notes(context, recurring_artists, top_genres)
-
-        return DiagnosisResponse(
-            recurring_artists=recurring_artists,
-            top_genres=top_genres,
-            audio_feature_profile=audio_profile,
-            notes=notes,
-            total_artists_analyzed=len(context.artists),
-            total_tracks_analyzed=len(context.known_track_ids),
-        )
+        # Build full context across all time windows. The per-window
+        # Spotify requests go out concurrently (paced by the shared rate
+        # limiter), so this costs about one round trip, not six.
+        context = await get_user_context(client, time_range="all")
+
+        return _diagnosis_response(context)
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Diagnosis failed: {str(e)}")
 
 
+def _diagnosis_response(context: UserContext) -> ORJSONResponse:
+    """
+    Serialize a diagnosis in DiagnosisResponse's shape. The context is
+    trusted internal data, so the dicts are returned as-is (response_model
+    still documents them) instead of being validated model by model.
+    """
+    # Format recurring artists
+    recurring_artists = []
+    for artist_id in context.recurring_artist_ids[:15]:
+        if artist_id in context.artists:
+            a = context.artists[artist_id]
+            recurring_artists.append({
+                "id": a.id,
+                "name": a.name,
+                "genres": a.genres[:5],
+                "popularity": a.popularity,
+                "in_short_term": a.in_short_term,
+                "in_medium_term": a.in_medium_term,
+                "in_long_term": a.in_long_term,
+                "recurrence_score": a.recurrence_score,
+            })
+
+    # Format top genres
+    top_genres = [
+        {"genre": g, "weight": round(w, 3)}
+        for g, w in context.top_genres(10)
+    ]
+
+    # Format audio feature profile (float() keeps int defaults serializing as floats)
+    ap = context.audio_profile
+    audio_profile = {
+        "energy": {"center": round(float(ap.energy_center), 3)},
+        "danceability": {"center": round(float(ap.danceability_center), 3)},
+        "valence": {"center": round(float(ap.valence_center), 3)},
+        "tempo": {"center": round(float(ap.tempo_center), 1)},
+        "acousticness": {"center": round(float(ap.acousticness_center), 3)},
+        "instrumentalness": {"center": round(float(ap.instrumentalness_center), 3)},
+    }
+
+    # Generate template-based notes
+    notes = _generate_diagnosis_notes(context, recurring_artists, top_genres)
+
+    return ORJSONResponse({
+        "recurring_artists": recurring_artists,
+        "top_genres": top_genres,
+        "audio_feature_profile": audio_profile,
+        "notes": notes,
+        "total_artists_analyzed": len(context.artists),
+        "total_tracks_analyzed": len(context.known_track_ids),
+    })
+
+
+# Audio profile observations:
+# (profile field, high threshold, low threshold, note above high, note below low)
+_AUDIO_NOTE_RULES = (
+    ("energy_center", 0.7, 0.4,
+     "Your listening skews high-energy.",
+     "Your listening skews low-energy/calm."),
+    ("valence_center", 0.6, 0.4,
+     "Your listening tends toward positive/upbeat moods.",
+     "Your listening tends toward darker/melancholic moods."),
+)
+
+
 def _generate_diagnosis_notes(
     context: UserContext,
-    recurring_artists: list[RecurringArtist],
-    top_genres: list[GenreWeight]
+    recurring_artists: list[dict],
+    top_genres: list[dict]
 ) -> list[str]:
     """Generate template-based observations. No AI."""
     notes = []
 
     # Cluster summary
     if top_genres:
-        genre_names = [g.genre for g in top_genres[:3]]
+        genre_names = [g["genre"] for g in top_genres[:3]]
         notes.append(f"Your listening clusters around: {', '.join(genre_names)}.")
 
     # Recurring artists summary
     if recurring_artists:
-        artist_names = [a.name for a in recurring_artists[:3]]
+        artist_names = [a["name"] for a in recurring_artists[:3]]
         notes.append(f"Your most stable recurring artists: {', '.join(artist_names)}.")
 
     # Recurrence rate
@@ -293,15 +346,12 @@ def _generate_diagnosis_notes(
 
     # Audio profile observations
     ap = context.audio_profile
-    if ap.energy_center > 0.7:
-        notes.append("Your listening skews high-energy.")
-    elif ap.energy_center < 0.4:
-        notes.append("Your listening skews low-energy/calm.")
-
-    if ap.valence_center > 0.6:
-        notes.append("Your listening tends toward positive/upbeat moods.")
-    elif ap.valence_center < 0.4:
-        notes.append("Your listening tends toward darker/melancholic moods.")
+    for attr, high, low, high_note, low_note in _AUDIO_NOTE_RULES:
+        value = getattr(ap, attr)
+        if value > high:
+            notes.append(high_note)
+        elif value < low:
+            notes.append(low_note)
 
     return notes
 
@@ -327,8 +377,12 @@ async def run_omission_scan(
     try:
         client = SpotifyClient(access_token)
 
-        # Build context
-        context = await build_user_context(client, time_range="all")
+        # Build context (reuses the one from a recent diagnosis) while the
+        # feedback adjustments load from SQLite in a worker thread
+        context, feedback_adjustments = await asyncio.gather(
+            get_user_context(client, time_range="all"),
+            asyncio.to_thread(db.get_feedback_adjustments),
+        )
 
         # Expand candidates (requires 2+ seed support)
         candidates = await expand_candidates(
@@ -339,58 +393,50 @@ async def run_omission_scan(
         )
 
         if not candidates:
-            return OmissionScanResponse(
-                results=[],
-                diagnosis_summary=_get_diagnosis_summary(context),
-                candidates_evaluated=0,
-                confidence_threshold_used=0.55,
-            )
+            return _scan_response([], context, 0)
 
         # Score and filter by confidence gate
         top_results = get_top_recommendations(
-            candidates, context, limit=MAX_RESULTS
+            candidates, context, limit=MAX_RESULTS,
+            feedback_adjustments=feedback_adjustments
         )
 
-        # Format results with evidence
+        # Format results with evidence. The dicts already have the response
+        # model's shape, so they're returned as-is (response_model still
+        # documents it) instead of being validated model by model.
         results = []
         for scored in top_results:
             c = scored.candidate
-            results.append(OmissionResultItem(
-                artist_id=c.id,
-                artist_name=c.name,
-                sample_track_name=c.sample_track_name,
-                genres=c.genres[:3],
-                omission_score=round(scored.omission_score, 3),
-                explanation=scored.explanation,
-                evidence=EvidenceItem(
-                    seed_artists=scored.seed_artists or [],
-                    genre_overlap_count=scored.genre_overlap_count,
-                    audio_similarity_score=scored.audio_similarity_score,
-                    popularity=c.popularity,
-                    earliest_album_year=scored.earliest_album_year,
-                ),
-            ))
-
-        return OmissionScanResponse(
-            results=results,
-            diagnosis_summary=_get_diagnosis_summary(context),
-            candidates_evaluated=len(candidates),
-            confidence_threshold_used=0.55,
-        )
+            results.append({
+                "artist_id": c.id,
+                "artist_name": c.name,
+                "sample_track_name": c.sample_track_name,
+                "genres": c.genres[:3],
+                "omission_score": round(scored.omission_score, 3),
+                "explanation": scored.explanation,
+                "evidence": {
+                    "seed_artists": scored.seed_artists or [],
+                    "genre_overlap_count": scored.genre_overlap_count,
+                    "audio_similarity_score": scored.audio_similarity_score,
+                    "popularity": c.popularity,
+                    "earliest_album_year": scored.earliest_album_year,
+                },
+            })
+
+        return _scan_response(results, context, len(candidates))
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Scan failed: {str(e)}")
 
 
-def _get_diagnosis_summary(context: UserContext) -> str:
-    """One-line summary of the diagnosis context."""
-    top_genres = sorted(
-        context.genre_weights.items(),
-        key=lambda x: x[1],
-        reverse=True
-    )[:3]
-    genre_str = ", ".join([g[0] for g in top_genres])
-    return f"Based on {len(context.artists)} artists, {len(context.recurring_artist_ids)} recurring. Top genres: {genre_str}."
+def _scan_response(results: list[dict], context: UserContext, candidates_evaluated: int) -> ORJSONResponse:
+    """Serialize a scan in OmissionScanResponse's shape."""
+    return ORJSONResponse({
+        "results": results,
+        "diagnosis_summary": context.diagnosis_summary(),
+        "candidates_evaluated": candidates_evaluated,
+        "confidence_threshold_used": 0.55,
+    })
 
 
 # =========================================================================
@@ -409,7 +455,7 @@ def submit_feedback(request: FeedbackRequest):
     - Down-rank rejected artists (-0.15)
     - Hard-exclude artists rejected 2+ times
     """
-    if request.verdict not in ("accept", "reject"):
+    if request.verdict not in db.VALID_VERDICTS:
         raise HTTPException(status_code=400, detail="Verdict must be 'accept' or 'reject'")
 
     success = db.add_feedback(
@@ -434,8 +480,9 @@ def submit_feedback(request: FeedbackRequest):
 @app.get("/feedback/stats", response_model=FeedbackStatsResponse)
 def get_feedback_stats():
     """Get aggregate feedback statistics."""
-    stats = db.get_feedback_stats()
-    return FeedbackStatsResponse(**stats)
+    # The stats dict already has the response model's shape; returning a
+    # Response skips re-validating it (response_model still documents it)
+    return ORJSONResponse(db.get_feedback_stats())
 
 
 @app.get("/feedback/history")
@@ -448,10 +495,14 @@ def get_feedback_history(limit: int = Query(50, ge=1, le=200)):
 # HEALTH CHECK
 # =========================================================================
 
+_HEALTH = {"status": "ok", "service": "latent-search", "version": "0.2.0"}
+
+
 @app.get("/health")
 def health_check():
     """Health check endpoint."""
-    return {"status": "ok", "service": "latent-search", "version": "0.2.0"}
+    # Returned as a Response so FastAPI skips its encoding pass
+    return ORJSONResponse(_HEALTH)
 
 
 if __name__ == "__main__":
@@ -13,9 +13,16 @@ For each candidate artist, computes an "omission score" that measures:
 CONFIDENCE GATE: Only returns candidates that pass all thresholds.
 High omission score = "This artist SHOULD be in your library, but isn't."
 """
+import heapq
 from dataclasses import dataclass
+from operator import attrgetter
 from typing import Optional
-from candidate_expander import CandidateArtist
+from candidate_expander import (
+    CandidateArtist,
+    GenreIndex,
+    build_genre_index,
+    _partial_genre_match,
+)
 from context_builder import UserContext, AudioFeatureProfile
 from config import (
     OMISSION_WEIGHTS,
@@ -29,7 +36,7 @@ from config import (
 import database as db
 
 
-@dataclass
+@dataclass(slots=True)
 class ScoredCandidate:
     """A candidate with computed omission score, evidence, and explanation."""
     candidate: CandidateArtist
@@ -72,34 +79,55 @@ EXPLANATION_TEMPLATES = {
 def score_candidates(
     candidates: list[CandidateArtist],
     context: UserContext,
-    apply_feedback: bool = True
+    apply_feedback: bool = True,
+    feedback_adjustments: Optional[dict[str, float]] = None,
+    limit: Optional[int] = None
 ) -> list[ScoredCandidate]:
     """
     Score all candidates and return sorted by omission score.
     Only returns candidates that pass the confidence gate.
+
+    feedback_adjustments: preloaded db.get_feedback_adjustments() result;
+    fetched here when not given.
+    limit: keep only the top N. Evidence and explanations are built for
+    the kept candidates only.
     """
     scored = []
 
     # Get feedback history for score adjustments
-    feedback_adjustments = {}
-    if apply_feedback:
+    if not apply_feedback:
+        feedback_adjustments = {}
+    elif feedback_adjustments is None:
         feedback_adjustments = db.get_feedback_adjustments()
 
     # Dynamic seed support threshold based on recurring artists
     num_recurring = len(context.recurring_artist_ids)
     effective_min_seed = MIN_SEED_SUPPORT if num_recurring >= 3 else 1
 
+    # The user's audio centers are the same for every candidate
+    audio_centers = _audio_centers(context.audio_profile)
+
     for candidate in candidates:
         scored_candidate = _score_single_candidate(
-            candidate, context, feedback_adjustments, effective_min_seed
+            candidate, context, feedback_adjustments, effective_min_seed,
+            audio_centers
         )
 
         # CONFIDENCE GATE: Only include if confident
         if scored_candidate.is_confident:
             scored.append(scored_candidate)
 
-    # Sort by omission score (highest first)
-    scored.sort(key=lambda s: s.omission_score, reverse=True)
+    # Sort by omission score (highest first; ties keep candidate order)
+    by_score = attrgetter("omission_score")
+    if limit is None:
+        scored.sort(key=by_score, reverse=True)
+    else:
+        scored = heapq.nlargest(limit, scored, key=by_score)
+
+    # Genre lookup tables shared by every kept candidate
+    genre_index = build_genre_index(context.genre_weights) if scored else None
+    for scored_candidate in scored:
+        _add_evidence(scored_candidate, context, genre_index)
 
     return scored
 
@@ -107,28 +135,34 @@ def score_candidates(
 def get_top_recommendations(
     candidates: list[CandidateArtist],
     context: UserContext,
-    limit: int = MAX_RESULTS
+    limit: int = MAX_RESULTS,
+    feedback_adjustments: Optional[dict[str, float]] = None
 ) -> list[ScoredCandidate]:
     """
     Score candidates and return top N recommendations.
     Strict cap at MAX_RESULTS (5).
     """
-    scored = score_candidates(candidates, context, apply_feedback=True)
-
     # STRICT CAP: never return more than MAX_RESULTS
     capped_limit = min(limit, MAX_RESULTS)
 
-    return scored[:capped_limit]
+    return score_candidates(
+        candidates, context, apply_feedback=True,
+        feedback_adjustments=feedback_adjustments,
+        limit=capped_limit
+    )
 
 
 def _score_single_candidate(
     candidate: CandidateArtist,
     context: UserContext,
     feedback_adjustments: dict[str, float],
-    effective_min_seed: int = MIN_SEED_SUPPORT
+    effective_min_seed: int = MIN_SEED_SUPPORT,
+    audio_centers: Optional[tuple[tuple[str, float], ...]] = None
 ) -> ScoredCandidate:
     """
     Compute omission score for a single candidate.
+    Evidence and explanation are added separately (_add_evidence), once
+    the candidate is known to be returned.
 
     OMISSION SCORE FORMULA:
     score = (contextual_similarity * w1) +
@@ -141,11 +175,27 @@ def _score_single_candidate(
     - seed_support_count >= 2
     - contextual_similarity >= 0.55
     - popularity <= 70
+
+    Candidates failing the gate's integer checks come back unscored
+    (is_confident=False) - callers drop them without looking at scores.
     """
+    # Cheap half of the confidence gate first: these would fail it anyway
+    if (candidate.seed_support_count < effective_min_seed or
+            candidate.popularity > MAX_POPULARITY_GATE):
+        return ScoredCandidate(candidate=candidate, is_confident=False)
+
     # =========================================================================
     # COMPONENT 1: Contextual Similarity
     # =========================================================================
-    contextual_similarity = _compute_contextual_similarity(candidate, context)
+    # Audio similarity feeds both this and the evidence - compute it once
+    audio_similarity = 0.0
+    if candidate.audio_features:
+        audio_similarity = _compute_audio_similarity(
+            candidate.audio_features,
+            context.audio_profile,
+            audio_centers
+        )
+    contextual_similarity = _compute_contextual_similarity(candidate, audio_similarity)
 
     # =========================================================================
     # COMPONENT 2: Exposure Score (pre-filtered, should be 1.0)
@@ -155,28 +205,32 @@ def _score_single_candidate(
     # =========================================================================
     # COMPONENT 3: Playlist Saturation Score
     # =========================================================================
-    saturation_score = _compute_saturation_score(candidate.popularity)
+    # Popularity is a 0-100 int (<= MAX_POPULARITY_GATE past the gate above)
+    saturation_score = _SATURATION_BY_POPULARITY[candidate.popularity]
 
     # =========================================================================
     # COMPONENT 4: Popularity Score
     # =========================================================================
-    popularity_score = _compute_popularity_score(candidate.popularity)
+    popularity_score = _POPULARITY_SCORE_BY_POPULARITY[candidate.popularity]
 
     # =========================================================================
     # COMPONENT 5: Recency Score
     # =========================================================================
-    recency_score = _compute_recency_score(candidate.earliest_release_year)
+    recency_score = _RECENCY_BY_YEAR.get(candidate.earliest_release_year)
+    if recency_score is None:
+        recency_score = _compute_recency_score(candidate.earliest_release_year)
 
     # =========================================================================
     # FINAL OMISSION SCORE (weighted sum)
     # =========================================================================
-    weights = OMISSION_WEIGHTS
+    # One tuple unpack instead of five named-field lookups
+    w_context, w_exposure, w_saturation, w_popularity, w_recency = OMISSION_WEIGHTS
     omission_score = (
-        contextual_similarity * weights["contextual_similarity"] +
-        exposure_score * weights["exposure_penalty"] +
-        saturation_score * weights["playlist_saturation"] +
-        popularity_score * weights["popularity_penalty"] +
-        recency_score * weights["recency_penalty"]
+        contextual_similarity * w_context +
+        exposure_score * w_exposure +
+        saturation_score * w_saturation +
+        popularity_score * w_popularity +
+        recency_score * w_recency
     )
 
     # =========================================================================
@@ -189,34 +243,8 @@ def _score_single_candidate(
     # =========================================================================
     # CONFIDENCE GATE (dynamic based on recurring artists)
     # =========================================================================
-    is_confident = (
-        candidate.seed_support_count >= effective_min_seed and
-        contextual_similarity >= MIN_CONTEXTUAL_SIMILARITY and
-        candidate.popularity <= MAX_POPULARITY_GATE
-    )
-
-    # =========================================================================
-    # COMPUTE EVIDENCE FIELDS
-    # =========================================================================
-    genre_overlap_count = _count_genre_overlap(candidate.genres, context.genre_weights)
-
-    audio_similarity = 0.0
-    if candidate.audio_features:
-        audio_similarity = _compute_audio_similarity(
-            candidate.audio_features,
-            context.audio_profile
-        )
-
-    # =========================================================================
-    # GENERATE EXPLANATION (template-based, no AI)
-    # =========================================================================
-    explanation = _generate_explanation(
-        candidate=candidate,
-        contextual_similarity=contextual_similarity,
-        popularity_score=popularity_score,
-        recency_score=recency_score,
-        genre_overlap_count=genre_overlap_count,
-    )
+    # (seed support and popularity were checked on entry)
+    is_confident = contextual_similarity >= MIN_CONTEXTUAL_SIMILARITY
 
     return ScoredCandidate(
         candidate=candidate,
@@ -227,33 +255,50 @@ def _score_single_candidate(
         recency_score=recency_score,
         omission_score=omission_score,
         is_confident=is_confident,
-        explanation=explanation,
-        # Evidence fields
-        seed_artists=candidate.seed_artist_names,
-        genre_overlap_count=genre_overlap_count,
         audio_similarity_score=round(audio_similarity, 3),
-        earliest_album_year=candidate.earliest_release_year,
+    )
+
+
+def _add_evidence(
+    scored: ScoredCandidate,
+    context: UserContext,
+    genre_index: Optional[GenreIndex] = None
+) -> None:
+    """Fill in a scored candidate's evidence fields and explanation."""
+    candidate = scored.candidate
+
+    # =========================================================================
+    # COMPUTE EVIDENCE FIELDS
+    # =========================================================================
+    scored.genre_overlap_count = _count_genre_overlap(
+        candidate.genres, context.genre_weights, genre_index
+    )
+    scored.seed_artists = candidate.seed_artist_names
+    scored.earliest_album_year = candidate.earliest_release_year
+
+    # =========================================================================
+    # GENERATE EXPLANATION (template-based, no AI)
+    # =========================================================================
+    scored.explanation = _generate_explanation(
+        candidate=candidate,
+        contextual_similarity=scored.contextual_similarity,
+        popularity_score=scored.popularity_score,
+        recency_score=scored.recency_score,
+        genre_overlap_count=scored.genre_overlap_count,
     )
 
 
 def _compute_contextual_similarity(
     candidate: CandidateArtist,
-    context: UserContext
+    audio_score: float
 ) -> float:
     """
     Compute how similar this candidate is to user's listening context.
-    Combines genre overlap and audio feature similarity.
+    Combines genre overlap and audio feature similarity (audio_score,
+    0 when the candidate has no audio features).
     """
     # Genre overlap (already computed in candidate expansion)
-    genre_score = getattr(candidate, 'genre_overlap', 0.0)
-
-    # Audio feature similarity
-    audio_score = 0.0
-    if candidate.audio_features:
-        audio_score = _compute_audio_similarity(
-            candidate.audio_features,
-            context.audio_profile
-        )
+    genre_score = candidate.genre_overlap
 
     # Boost from seed support (structural connection)
     seed_boost = min(0.2, candidate.seed_support_count * 0.05)
@@ -267,23 +312,30 @@ def _compute_contextual_similarity(
     return min(1.0, base_score)
 
 
+def _audio_centers(user_profile: AudioFeatureProfile) -> tuple[tuple[str, float], ...]:
+    """(feature, user center) pairs compared by _compute_audio_similarity (tempo aside)."""
+    return (
+        ("energy", user_profile.energy_center),
+        ("danceability", user_profile.danceability_center),
+        ("valence", user_profile.valence_center),
+        ("acousticness", user_profile.acousticness_center),
+        ("instrumentalness", user_profile.instrumentalness_center),
+    )
+
+
 def _compute_audio_similarity(
     candidate_features: dict,
-    user_profile: AudioFeatureProfile
+    user_profile: AudioFeatureProfile,
+    feature_pairs: Optional[tuple[tuple[str, float], ...]] = None
 ) -> float:
     """
     Compute how similar candidate's audio features are to user's profile.
-    Returns 0-1 score.
+    Returns 0-1 score. feature_pairs: precomputed _audio_centers(user_profile).
     """
     similarities = []
 
-    feature_pairs = [
-        ("energy", user_profile.energy_center),
-        ("danceability", user_profile.danceability_center),
-        ("valence", user_profile.valence_center),
-        ("acousticness", user_profile.acousticness_center),
-        ("instrumentalness", user_profile.instrumentalness_center),
-    ]
+    if feature_pairs is None:
+        feature_pairs = _audio_centers(user_profile)
 
     for feature_name, user_center in feature_pairs:
         candidate_value = candidate_features.get(feature_name)
@@ -345,20 +397,39 @@ def _compute_recency_score(earliest_year: Optional[int]) -> float:
         return 1.0 - (years_since_cutoff / max_years) * 0.8
 
 
+# The per-candidate scores above have tiny domains, so scoring looks them
+# up instead of re-deriving them: popularity is a 0-100 int, and release
+# years outside this range (or None) fall back to _compute_recency_score
+_SATURATION_BY_POPULARITY = tuple(_compute_saturation_score(p) for p in range(101))
+_POPULARITY_SCORE_BY_POPULARITY = tuple(_compute_popularity_score(p) for p in range(101))
+_RECENCY_BY_YEAR = {
+    None: _compute_recency_score(None),
+    **{year: _compute_recency_score(year) for year in range(1900, 2031)},
+}
+
+
 def _count_genre_overlap(
     candidate_genres: list[str],
-    user_genre_weights: dict[str, float]
+    user_genre_weights: dict[str, float],
+    genre_index: Optional[GenreIndex] = None
 ) -> int:
-    """Count how many of the candidate's genres match user's profile."""
+    """
+    Count how many of the candidate's genres match user's profile.
+    Matches follow the candidate expander's rules (exact, or token-aligned
+    partial in either direction), so this counts the same genres that
+    produced the candidate's genre overlap. Pass a shared genre_index when
+    counting many candidates against one profile.
+    """
+    if not candidate_genres or not user_genre_weights:
+        return 0
+
+    if genre_index is None:
+        genre_index = build_genre_index(user_genre_weights)
+
     count = 0
     for genre in candidate_genres:
-        if genre in user_genre_weights:
+        if genre in user_genre_weights or _partial_genre_match(genre, genre_index) is not None:
             count += 1
-        else:
-            for user_genre in user_genre_weights:
-                if genre in user_genre or user_genre in genre:
-                    count += 1
-                    break
     return count
 
 
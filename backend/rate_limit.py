@@ -0,0 +1,58 @@
+"""
+Async rate limiting for outbound API calls.
+
+Spotify starts returning 429s when a client bursts, so requests are
+spaced out evenly (leaky bucket) and the number in flight is capped.
+"""
+import asyncio
+import time
+import weakref
+
+
+class LeakyBucket:
+    """
+    Allow at most `rate` requests per `per` seconds, evenly spaced,
+    with at most `concurrency` requests in flight at once.
+
+    Usage:
+        async with limiter:
+            response = await http.get(...)
+
+    Safe to create at import and share: an asyncio.Semaphore binds to the
+    first event loop that waits on it, so each running loop gets its own.
+    """
+
+    def __init__(self, rate: int, per: float, concurrency: int):
+        self.interval = per / rate
+        self.concurrency = concurrency
+        self._sems: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore] = (
+            weakref.WeakKeyDictionary()
+        )
+        self._next_slot = 0.0
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        """The in-flight cap for the running event loop."""
+        loop = asyncio.get_running_loop()
+        sem = self._sems.get(loop)
+        if sem is None:
+            sem = self._sems[loop] = asyncio.Semaphore(self.concurrency)
+        return sem
+
+    async def __aenter__(self):
+        sem = self._semaphore()
+        await sem.acquire()
+        try:
+            # Reserve the next free send slot (no await between read and write)
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+            if slot > now:
+                await asyncio.sleep(slot - now)
+        except BaseException:
+            sem.release()
+            raise
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._semaphore().release()
+        return False
@@ -33,6 +33,7 @@ from .telegram_music import search_telegram, get_telegram_underground, TelegramT
 from .netease import search_netease, get_netease_indie, NetEaseTrack
 from .funkwhale import search_funkwhale, get_funkwhale_underground, FunkwhaleTrack
 from .mixcloud import search_mixcloud, get_mixcloud_underground, MixcloudTrack
+from .http import close_session
 
 __all__ = [
     # Original sources
@@ -71,4 +72,6 @@ __all__ = [
     "shadow_search",
     "deep_shadow_search",
     "ShadowTrack",
+    # Shared aiohttp session (close on shutdown)
+    "close_session",
 ]
@@ -5,14 +5,21 @@ Combines results from Bandcamp, Reddit, and SoundCloud
 into a unified format for the search API.
 """
 import asyncio
+import itertools
+import logging
 from dataclasses import dataclass, field
 from typing import Optional
 from .bandcamp import search_bandcamp, BandcampTrack
 from .reddit import search_reddit, RedditTrack
 from .soundcloud import search_soundcloud, SoundCloudTrack, compute_shadow_score
 
+log = logging.getLogger(__name__)
 
-@dataclass
+# Seconds to wait for any one source; a stalled source is skipped
+SOURCE_TIMEOUT = 8.0
+
+
+@dataclass(slots=True)
 class ExternalTrack:
     """Unified track format from external sources."""
     id: str
@@ -91,6 +98,14 @@ def _soundcloud_to_external(track: SoundCloudTrack) -> ExternalTrack:
     )
 
 
+# Per-source search result -> ExternalTrack converters
+_CONVERTERS = {
+    "bandcamp": _bandcamp_to_external,
+    "reddit": _reddit_to_external,
+    "soundcloud": _soundcloud_to_external,
+}
+
+
 async def search_all_sources(
     query: str,
     sources: Optional[list[str]] = None,
@@ -111,51 +126,50 @@ async def search_all_sources(
     if sources is None:
         sources = ["bandcamp", "reddit", "soundcloud"]
 
-    tasks = []
+    names: list[str] = []
+    coros = []
 
     if "bandcamp" in sources:
-        tasks.append(("bandcamp", search_bandcamp(query, limit=limit_per_source)))
+        names.append("bandcamp")
+        coros.append(search_bandcamp(query, limit=limit_per_source))
 
     if "reddit" in sources:
-        tasks.append(("reddit", search_reddit(query, limit=limit_per_source)))
+        names.append("reddit")
+        coros.append(search_reddit(query, limit=limit_per_source))
 
     if "soundcloud" in sources:
-        tasks.append(("soundcloud", search_soundcloud(query, limit=limit_per_source)))
+        names.append("soundcloud")
+        coros.append(search_soundcloud(query, limit=limit_per_source))
 
-    # Run all searches concurrently with timeout
+    # Run all searches concurrently, each with its own timeout, so one
+    # stalled source can't hold up the others' results
     all_tracks: list[ExternalTrack] = []
 
     results = await asyncio.gather(
-        *[t[1] for t in tasks],
+        *[asyncio.wait_for(c, SOURCE_TIMEOUT) for c in coros],
         return_exceptions=True
     )
 
-    for (source_name, _), result in zip(tasks, results):
+    for source_name, result in zip(names, results):
+        if isinstance(result, asyncio.TimeoutError):
+            log.warning("%s search timed out after %gs", source_name, SOURCE_TIMEOUT)
+            continue
         if isinstance(result, Exception):
-            print(f"[DEBUG] {source_name} search failed: {result}")
+            log.warning("%s search failed: %s", source_name, result)
             continue
 
-        for track in result:
-            if source_name == "bandcamp":
-                all_tracks.append(_bandcamp_to_external(track))
-            elif source_name == "reddit":
-                all_tracks.append(_reddit_to_external(track))
-            elif source_name == "soundcloud":
-                all_tracks.append(_soundcloud_to_external(track))
+        all_tracks.extend(map(_CONVERTERS[source_name], result))
 
     # Sort by shadow score (highest first = most underground)
     all_tracks.sort(key=lambda t: t.shadow_score, reverse=True)
 
-    # Deduplicate by artist+title similarity
-    seen = set()
-    unique_tracks = []
+    # Deduplicate by artist+title similarity, keeping the first (highest
+    # scored) track for each key - dicts preserve insertion order
+    unique_tracks: dict[str, ExternalTrack] = {}
     for track in all_tracks:
-        key = f"{track.artist.lower()}:{track.title.lower()}"
-        if key not in seen:
-            seen.add(key)
-            unique_tracks.append(track)
+        unique_tracks.setdefault(f"{track.artist.lower()}:{track.title.lower()}", track)
 
-    return unique_tracks
+    return list(unique_tracks.values())
 
 
 async def search_by_genre(
@@ -176,26 +190,22 @@ async def search_by_genre(
         f"{genre} rare",
     ]
 
-    all_results: list[ExternalTrack] = []
-
-    for q in queries:
-        results = await search_all_sources(
+    # The variants are independent - search them all at once
+    results = await asyncio.gather(*[
+        search_all_sources(
             q,
             sources=sources,
             limit_per_source=limit // len(queries)
         )
-        all_results.extend(results)
-
-        if len(all_results) >= limit:
-            break
+        for q in queries
+    ])
+    all_results = list(itertools.chain.from_iterable(results))
 
-    # Deduplicate
-    seen = set()
-    unique = []
+    # Deduplicate, keeping the first track seen for each id
+    by_id: dict[str, ExternalTrack] = {}
     for track in all_results:
-        if track.id not in seen:
-            seen.add(track.id)
-            unique.append(track)
+        by_id.setdefault(track.id, track)
+    unique = list(by_id.values())
 
     # Sort by shadow score
     unique.sort(key=lambda t: t.shadow_score, reverse=True)
@@ -10,13 +10,18 @@ The Internet Archive has a massive collection of free, legal music including:
 No API key required - completely open.
 """
 
-import httpx
+import heapq
+import logging
+import orjson
 from dataclasses import dataclass
 from typing import Optional
 import urllib.parse
+from .http import get_client
 
+log = logging.getLogger(__name__)
 
-@dataclass
+
+@dataclass(slots=True)
 class ArchiveTrack:
     id: str
     title: str
@@ -45,7 +50,8 @@ MUSIC_COLLECTIONS = [
 async def search_archive(
     query: str,
     limit: int = 20,
-    collection: Optional[str] = None
+    collection: Optional[str] = None,
+    filter_clause: Optional[str] = None
 ) -> list[ArchiveTrack]:
     """
     Search Internet Archive for music.
@@ -54,6 +60,8 @@ async def search_archive(
         query: Search query
         limit: Max results
         collection: Specific collection to search (or None for all music)
+        filter_clause: Extra Lucene clause ANDed into the query
+            (e.g. "downloads:[0 TO 999]")
 
     Returns:
         List of ArchiveTrack objects
@@ -72,6 +80,9 @@ async def search_archive(
             collections_query = " OR ".join([f"collection:{c}" for c in MUSIC_COLLECTIONS])
             search_parts.append(f"({collections_query})")
 
+        if filter_clause:
+            search_parts.append(filter_clause)
+
         full_query = " AND ".join(search_parts)
 
         params = {
@@ -82,68 +93,68 @@ async def search_archive(
             "sort[]": "downloads desc",  # Sort by popularity
         }
 
-        async with httpx.AsyncClient(timeout=15.0) as client:
-            url = "https://archive.org/advancedsearch.php"
-            resp = await client.get(url, params=params)
-
-            if resp.status_code != 200:
-                print(f"[archive] Search failed: {resp.status_code}")
-                return []
-
-            data = resp.json()
-            docs = data.get("response", {}).get("docs", [])
-
-            for doc in docs:
-                identifier = doc.get("identifier", "")
-                if not identifier:
-                    continue
-
-                # Build URLs
-                item_url = f"https://archive.org/details/{identifier}"
-                # Archive.org thumbnail format
-                artwork_url = f"https://archive.org/services/img/{identifier}"
-
-                # Get collection (might be a list)
-                collection_val = doc.get("collection", [])
-                if isinstance(collection_val, list):
-                    collection_str = collection_val[0] if collection_val else "audio"
-                else:
-                    collection_str = collection_val
-
-                # Parse year
-                year = doc.get("year")
-                if isinstance(year, list):
-                    year = year[0] if year else None
-                try:
-                    year = int(year) if year else None
-                except (ValueError, TypeError):
-                    year = None
-
-                # Archive.org embed player URL
-                embed_url = f"https://archive.org/embed/{identifier}"
-
-                track = ArchiveTrack(
-                    id=f"archive_{identifier}",
-                    title=doc.get("title", "Untitled"),
-                    artist=doc.get("creator", "Unknown Artist"),
-                    url=item_url,
-                    artwork_url=artwork_url,
-                    collection=collection_str,
-                    year=year,
-                    downloads=doc.get("downloads", 0),
-                    description=doc.get("description", "")[:200] if doc.get("description") else None,
-                    embed_url=embed_url,
-                )
+        client = await get_client()
+        url = "https://archive.org/advancedsearch.php"
+        resp = await client.get(url, params=params, timeout=15.0)
+
+        if resp.status_code != 200:
+            log.warning("Search failed: %s", resp.status_code)
+            return []
+
+        data = orjson.loads(resp.content)
+        docs = data.get("response", {}).get("docs", [])
+
+        for doc in docs:
+            track = _parse_doc(doc)
+            if track is not None:
                 tracks.append(track)
 
-        print(f"[archive] Found {len(tracks)} items for '{query}'")
+        log.debug("Found %d items for '%s'", len(tracks), query)
 
     except Exception as e:
-        print(f"[archive] Error searching: {e}")
+        log.warning("Error searching: %s", e)
 
     return tracks
 
 
+def _first(value, default=None):
+    """Archive.org returns some fields as a scalar or a list: the first value."""
+    if isinstance(value, list):
+        return value[0] if value else default
+    return value
+
+
+def _parse_doc(doc: dict) -> Optional[ArchiveTrack]:
+    """Build an ArchiveTrack from an advancedsearch doc (None without an identifier)."""
+    identifier = doc.get("identifier")
+    if not identifier:
+        return None
+
+    # Parse year
+    year = _first(doc.get("year"))
+    try:
+        year = int(year) if year else None
+    except (ValueError, TypeError):
+        year = None
+
+    description = doc.get("description")
+
+    return ArchiveTrack(
+        id=f"archive_{identifier}",
+        title=doc.get("title", "Untitled"),
+        artist=doc.get("creator", "Unknown Artist"),
+        url=f"https://archive.org/details/{identifier}",
+        # Archive.org thumbnail format
+        artwork_url=f"https://archive.org/services/img/{identifier}",
+        collection=_first(doc.get("collection", []), "audio"),
+        year=year,
+        downloads=doc.get("downloads", 0),
+        description=description[:200] if description else None,
+        # Archive.org embed player URL
+        embed_url=f"https://archive.org/embed/{identifier}",
+    )
+
+
 async def get_netlabel_releases(
     query: str = "",
     limit: int = 20
@@ -186,18 +197,21 @@ async def get_underground_by_genre(
     """
     Get underground tracks by genre - low download counts = more obscure.
     """
-    # Search for genre
-    tracks = await search_archive(genre, limit=limit * 3)
-
-    # Filter to low-download items
-    underground = [t for t in tracks if t.downloads < max_downloads]
-
-    # Sort by downloads ascending (most obscure first)
-    underground.sort(key=lambda t: t.downloads)
-
-    print(f"[archive] Found {len(underground)} underground tracks (< {max_downloads} downloads)")
-
-    return underground[:limit]
+    # Let Archive.org drop items at or above max_downloads, so all `limit`
+    # rows come back usable instead of over-fetching and filtering here.
+    # Items with no download count are kept (they parse as 0 downloads);
+    # the negation is anchored on *:* since a bare negative clause inside
+    # a group matches nothing in Lucene.
+    underground = await search_archive(
+        genre,
+        limit=limit,
+        filter_clause=f"((*:* -downloads:*) OR downloads:[0 TO {max_downloads - 1}])",
+    )
+
+    log.debug("Found %d underground tracks (< %d downloads)", len(underground), max_downloads)
+
+    # Lowest downloads first = most obscure
+    return heapq.nsmallest(limit, underground, key=lambda t: t.downloads)
 
 
 async def get_african_archive(
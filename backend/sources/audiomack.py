@@ -9,12 +9,24 @@ Note: Their official API requires OAuth 1.0a registration.
 This uses their public web endpoints instead.
 """
 
-import httpx
+import asyncio
+import importlib.util
+import itertools
 from dataclasses import dataclass
 from typing import Optional
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 import re
 import json
+from .http import get_client
+
+
+# lxml parses several times faster than the pure-Python html.parser;
+# fall back to the latter where lxml (libxml2) isn't installed
+_HTML_PARSER = "lxml" if importlib.util.find_spec("lxml") is not None else "html.parser"
+
+# Search pages are read for embedded JSON and song links only; building
+# just those subtrees skips a Python object for every other node
+_SEARCH_NODES = SoupStrainer(["script", "a"])
 
 
 @dataclass
@@ -70,28 +82,33 @@ async def search_audiomack(
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
         }
 
-        async with httpx.AsyncClient(timeout=15.0, follow_redirects=True) as client:
-            resp = await client.get(search_url, headers=headers)
+        client = await get_client()
+        resp = await client.get(
+            search_url,
+            headers=headers,
+            timeout=15.0,
+            follow_redirects=True
+        )
 
-            if resp.status_code != 200:
-                print(f"[audiomack] Search failed: {resp.status_code}")
-                return []
+        if resp.status_code != 200:
+            print(f"[audiomack] Search failed: {resp.status_code}")
+            return []
 
-            soup = BeautifulSoup(resp.text, "html.parser")
+        soup = BeautifulSoup(resp.text, _HTML_PARSER, parse_only=_SEARCH_NODES)
 
-            # Look for JSON data in script tags (Next.js/React apps often embed this)
-            scripts = soup.find_all("script", type="application/json")
-            for script in scripts:
-                try:
-                    data = json.loads(script.string)
-                    # Try to extract track data from various possible structures
-                    tracks.extend(_extract_tracks_from_json(data, limit))
-                except (json.JSONDecodeError, TypeError):
-                    continue
+        # Look for JSON data in script tags (Next.js/React apps often embed this)
+        scripts = soup.find_all("script", type="application/json")
+        for script in scripts:
+            try:
+                data = json.loads(script.string)
+                # Try to extract track data from various possible structures
+                tracks.extend(_extract_tracks_from_json(data, limit))
+            except (json.JSONDecodeError, TypeError):
+                continue
 
-            # Also try parsing HTML directly
-            if not tracks:
-                tracks = _parse_audiomack_html(soup, limit)
+        # Also try parsing HTML directly
+        if not tracks:
+            tracks = _parse_audiomack_html(soup, limit)
 
         print(f"[audiomack] Found {len(tracks)} tracks for '{query}'")
 
@@ -207,11 +224,12 @@ async def get_african_trending(limit: int = 20) -> list[AudiomackTrack]:
     Get trending African music on Audiomack.
     Focuses on genres popular in Africa.
     """
-    all_tracks = []
-
-    for genre in AFRICAN_GENRES[:3]:  # Top 3 genres to avoid too many requests
-        tracks = await search_audiomack(genre, limit=limit // 3)
-        all_tracks.extend(tracks)
+    # Top 3 genres to avoid too many requests - searched all at once
+    results = await asyncio.gather(*[
+        search_audiomack(genre, limit=limit // 3)
+        for genre in AFRICAN_GENRES[:3]
+    ])
+    all_tracks = list(itertools.chain.from_iterable(results))
 
     # Remove duplicates by ID
     seen = set()
@@ -239,10 +257,12 @@ async def search_african_artists(
         f"{query} african",
     ]
 
-    all_tracks = []
-    for q in enhanced_queries:
-        tracks = await search_audiomack(q, limit=limit // 2)
-        all_tracks.extend(tracks)
+    # The queries are independent - search them all at once
+    results = await asyncio.gather(*[
+        search_audiomack(q, limit=limit // 2)
+        for q in enhanced_queries
+    ])
+    all_tracks = list(itertools.chain.from_iterable(results))
 
     # Remove duplicates
     seen = set()
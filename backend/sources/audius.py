@@ -5,6 +5,7 @@ Audius is a decentralized music streaming platform - great for Web3/underground
 API is free with no rate limits.
 """
 
+import heapq
 import httpx
 from dataclasses import dataclass
 from typing import Optional
@@ -217,9 +218,7 @@ async def get_underground_audius(
     # Filter to low-play tracks
     underground = [t for t in all_tracks if t.plays < max_plays]
 
-    # Sort by plays ascending (lowest first = most underground)
-    underground.sort(key=lambda t: t.plays)
-
     print(f"[audius] Found {len(underground)} underground tracks (< {max_plays} plays)")
 
-    return underground[:limit]
+    # Lowest plays first = most underground
+    return heapq.nsmallest(limit, underground, key=lambda t: t.plays)
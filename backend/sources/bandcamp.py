@@ -5,12 +5,32 @@ No API key required - uses web scraping.
 Bandcamp is excellent for finding indie/underground artists
 that don't exist on mainstream platforms.
 """
+import importlib.util
 import httpx
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 from dataclasses import dataclass
 from typing import Optional
 
 
+# lxml parses several times faster than the pure-Python html.parser;
+# fall back to the latter where lxml (libxml2) isn't installed
+_HTML_PARSER = "lxml" if importlib.util.find_spec("lxml") is not None else "html.parser"
+
+
+def _li_with_class(name: str) -> SoupStrainer:
+    """
+    Strainer for <li> elements carrying a class. While parsing, the
+    strainer sees the raw class attribute, so split it ourselves.
+    """
+    return SoupStrainer("li", class_=lambda value: value is not None and name in value.split())
+
+
+# Only the result list items are read; building just those subtrees skips
+# creating a Python object for every other node on the page
+_SEARCH_RESULTS = _li_with_class("searchresult")
+_TAG_ITEMS = _li_with_class("item")
+
+
 @dataclass
 class BandcampTrack:
     """A track found on Bandcamp."""
@@ -58,7 +78,7 @@ async def search_bandcamp(
             response = await client.get(url, headers=headers, timeout=5.0)
             response.raise_for_status()
 
-        soup = BeautifulSoup(response.text, "html.parser")
+        soup = BeautifulSoup(response.text, _HTML_PARSER, parse_only=_SEARCH_RESULTS)
         results = soup.find_all("li", class_="searchresult")
 
         for idx, result in enumerate(results[:limit]):
@@ -132,7 +152,7 @@ async def search_bandcamp_by_tag(
             response = await client.get(url, headers=headers, timeout=5.0)
             response.raise_for_status()
 
-        soup = BeautifulSoup(response.text, "html.parser")
+        soup = BeautifulSoup(response.text, _HTML_PARSER, parse_only=_TAG_ITEMS)
 
         # Tag pages have a different structure
         items = soup.find_all("li", class_="item")
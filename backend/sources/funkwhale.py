@@ -7,11 +7,12 @@ It uses ActivityPub protocol, meaning multiple instances can share content.
 This is truly underground - music hosted by individuals and small communities.
 """
 
-import aiohttp
 import asyncio
+import heapq
 from dataclasses import dataclass
 from typing import Optional
 import hashlib
+from .http import get_session
 
 
 @dataclass
@@ -70,59 +71,59 @@ async def search_funkwhale_instance(
     }
 
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                search_url,
-                headers=headers,
-                params=params,
-                timeout=10
-            ) as resp:
-                if resp.status != 200:
-                    return []
-
-                data = await resp.json()
-                results = data.get("results", [])
-
-                for track in results:
-                    track_id = track.get("id")
-                    artist_info = track.get("artist", {})
-                    album_info = track.get("album", {})
-
-                    # Build URLs
-                    track_url = f"{instance}/library/tracks/{track_id}"
-                    listen_url = track.get("listen_url")
-
-                    if listen_url and not listen_url.startswith("http"):
-                        listen_url = f"{instance}{listen_url}"
-
-                    # Get artwork
-                    artwork = None
-                    if album_info.get("cover"):
-                        cover = album_info["cover"]
-                        if isinstance(cover, dict):
-                            artwork = cover.get("urls", {}).get("medium_square_crop")
-                        elif isinstance(cover, str):
-                            artwork = cover
-                        if artwork and not artwork.startswith("http"):
-                            artwork = f"{instance}{artwork}"
-
-                    # Get embed URL
-                    embed_url = f"{instance}/embed.html?&type=track&id={track_id}"
-
-                    tracks.append(FunkwhaleTrack(
-                        id=f"funkwhale_{instance.split('//')[1].split('.')[0]}_{track_id}",
-                        title=track.get("title", "Unknown"),
-                        artist=artist_info.get("name", "Unknown Artist"),
-                        url=track_url,
-                        instance=instance,
-                        album=album_info.get("title"),
-                        plays=track.get("downloads_count", 0),
-                        duration=track.get("duration", 0),
-                        genre=None,  # Funkwhale uses tags, will extract below
-                        artwork_url=artwork,
-                        embed_url=embed_url,
-                        stream_url=listen_url,
-                    ))
+        session = await get_session()
+        async with session.get(
+            search_url,
+            headers=headers,
+            params=params,
+            timeout=10
+        ) as resp:
+            if resp.status != 200:
+                return []
+
+            data = await resp.json()
+            results = data.get("results", [])
+
+            for track in results:
+                track_id = track.get("id")
+                artist_info = track.get("artist", {})
+                album_info = track.get("album", {})
+
+                # Build URLs
+                track_url = f"{instance}/library/tracks/{track_id}"
+                listen_url = track.get("listen_url")
+
+                if listen_url and not listen_url.startswith("http"):
+                    listen_url = f"{instance}{listen_url}"
+
+                # Get artwork
+                artwork = None
+                if album_info.get("cover"):
+                    cover = album_info["cover"]
+                    if isinstance(cover, dict):
+                        artwork = cover.get("urls", {}).get("medium_square_crop")
+                    elif isinstance(cover, str):
+                        artwork = cover
+                    if artwork and not artwork.startswith("http"):
+                        artwork = f"{instance}{artwork}"
+
+                # Get embed URL
+                embed_url = f"{instance}/embed.html?&type=track&id={track_id}"
+
+                tracks.append(FunkwhaleTrack(
+                    id=f"funkwhale_{instance.split('//')[1].split('.')[0]}_{track_id}",
+                    title=track.get("title", "Unknown"),
+                    artist=artist_info.get("name", "Unknown Artist"),
+                    url=track_url,
+                    instance=instance,
+                    album=album_info.get("title"),
+                    plays=track.get("downloads_count", 0),
+                    duration=track.get("duration", 0),
+                    genre=None,  # Funkwhale uses tags, will extract below
+                    artwork_url=artwork,
+                    embed_url=embed_url,
+                    stream_url=listen_url,
+                ))
 
     except asyncio.TimeoutError:
         print(f"[funkwhale] Timeout for {instance}")
@@ -157,56 +158,56 @@ async def search_funkwhale_by_tag(
     }
 
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                search_url,
-                headers=headers,
-                params=params,
-                timeout=10
-            ) as resp:
-                if resp.status != 200:
-                    return []
-
-                data = await resp.json()
-                results = data.get("results", [])
-
-                for track in results:
-                    track_id = track.get("id")
-                    artist_info = track.get("artist", {})
-                    album_info = track.get("album", {})
-
-                    track_url = f"{instance}/library/tracks/{track_id}"
-                    listen_url = track.get("listen_url")
-
-                    if listen_url and not listen_url.startswith("http"):
-                        listen_url = f"{instance}{listen_url}"
-
-                    artwork = None
-                    if album_info.get("cover"):
-                        cover = album_info["cover"]
-                        if isinstance(cover, dict):
-                            artwork = cover.get("urls", {}).get("medium_square_crop")
-                        elif isinstance(cover, str):
-                            artwork = cover
-                        if artwork and not artwork.startswith("http"):
-                            artwork = f"{instance}{artwork}"
-
-                    embed_url = f"{instance}/embed.html?&type=track&id={track_id}"
-
-                    tracks.append(FunkwhaleTrack(
-                        id=f"funkwhale_{instance.split('//')[1].split('.')[0]}_{track_id}",
-                        title=track.get("title", "Unknown"),
-                        artist=artist_info.get("name", "Unknown Artist"),
-                        url=track_url,
-                        instance=instance,
-                        album=album_info.get("title"),
-                        plays=track.get("downloads_count", 0),
-                        duration=track.get("duration", 0),
-                        genre=tag,
-                        artwork_url=artwork,
-                        embed_url=embed_url,
-                        stream_url=listen_url,
-                    ))
+        session = await get_session()
+        async with session.get(
+            search_url,
+            headers=headers,
+            params=params,
+            timeout=10
+        ) as resp:
+            if resp.status != 200:
+                return []
+
+            data = await resp.json()
+            results = data.get("results", [])
+
+            for track in results:
+                track_id = track.get("id")
+                artist_info = track.get("artist", {})
+                album_info = track.get("album", {})
+
+                track_url = f"{instance}/library/tracks/{track_id}"
+                listen_url = track.get("listen_url")
+
+                if listen_url and not listen_url.startswith("http"):
+                    listen_url = f"{instance}{listen_url}"
+
+                artwork = None
+                if album_info.get("cover"):
+                    cover = album_info["cover"]
+                    if isinstance(cover, dict):
+                        artwork = cover.get("urls", {}).get("medium_square_crop")
+                    elif isinstance(cover, str):
+                        artwork = cover
+                    if artwork and not artwork.startswith("http"):
+                        artwork = f"{instance}{artwork}"
+
+                embed_url = f"{instance}/embed.html?&type=track&id={track_id}"
+
+                tracks.append(FunkwhaleTrack(
+                    id=f"funkwhale_{instance.split('//')[1].split('.')[0]}_{track_id}",
+                    title=track.get("title", "Unknown"),
+                    artist=artist_info.get("name", "Unknown Artist"),
+                    url=track_url,
+                    instance=instance,
+                    album=album_info.get("title"),
+                    plays=track.get("downloads_count", 0),
+                    duration=track.get("duration", 0),
+                    genre=tag,
+                    artwork_url=artwork,
+                    embed_url=embed_url,
+                    stream_url=listen_url,
+                ))
 
     except Exception as e:
         print(f"[funkwhale] Tag search error for {instance}: {e}")
@@ -231,12 +232,10 @@ async def search_funkwhale(query: str, limit: int = 20) -> list[FunkwhaleTrack]:
         if isinstance(result, list):
             all_tracks.extend(result)
 
-    # Sort by recency/plays
-    all_tracks.sort(key=lambda t: t.plays or 0, reverse=True)
-
     print(f"[funkwhale] Found {len(all_tracks)} tracks across instances")
 
-    return all_tracks[:limit]
+    # Most played first
+    return heapq.nlargest(limit, all_tracks, key=lambda t: t.plays or 0)
 
 
 async def get_funkwhale_underground(genre: str, limit: int = 20) -> list[FunkwhaleTrack]:
@@ -315,52 +314,52 @@ async def get_instance_library(instance: str, limit: int = 50) -> list[Funkwhale
     }
 
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, headers=headers, params=params, timeout=15) as resp:
-                if resp.status != 200:
-                    return []
-
-                data = await resp.json()
-                results = data.get("results", [])
-
-                for track in results:
-                    track_id = track.get("id")
-                    artist_info = track.get("artist", {})
-                    album_info = track.get("album", {})
-
-                    track_url = f"{instance}/library/tracks/{track_id}"
-                    listen_url = track.get("listen_url")
-                    if listen_url and not listen_url.startswith("http"):
-                        listen_url = f"{instance}{listen_url}"
-
-                    artwork = None
-                    if album_info.get("cover"):
-                        cover = album_info["cover"]
-                        if isinstance(cover, dict):
-                            artwork = cover.get("urls", {}).get("medium_square_crop")
-                        if artwork and not artwork.startswith("http"):
-                            artwork = f"{instance}{artwork}"
-
-                    embed_url = f"{instance}/embed.html?&type=track&id={track_id}"
-
-                    # Get tags
-                    tags = track.get("tags", [])
-                    genre = tags[0] if tags else None
-
-                    tracks.append(FunkwhaleTrack(
-                        id=f"funkwhale_{instance.split('//')[1].split('.')[0]}_{track_id}",
-                        title=track.get("title", "Unknown"),
-                        artist=artist_info.get("name", "Unknown Artist"),
-                        url=track_url,
-                        instance=instance,
-                        album=album_info.get("title"),
-                        plays=track.get("downloads_count", 0),
-                        duration=track.get("duration", 0),
-                        genre=genre,
-                        artwork_url=artwork,
-                        embed_url=embed_url,
-                        stream_url=listen_url,
-                    ))
+        session = await get_session()
+        async with session.get(url, headers=headers, params=params, timeout=15) as resp:
+            if resp.status != 200:
+                return []
+
+            data = await resp.json()
+            results = data.get("results", [])
+
+            for track in results:
+                track_id = track.get("id")
+                artist_info = track.get("artist", {})
+                album_info = track.get("album", {})
+
+                track_url = f"{instance}/library/tracks/{track_id}"
+                listen_url = track.get("listen_url")
+                if listen_url and not listen_url.startswith("http"):
+                    listen_url = f"{instance}{listen_url}"
+
+                artwork = None
+                if album_info.get("cover"):
+                    cover = album_info["cover"]
+                    if isinstance(cover, dict):
+                        artwork = cover.get("urls", {}).get("medium_square_crop")
+                    if artwork and not artwork.startswith("http"):
+                        artwork = f"{instance}{artwork}"
+
+                embed_url = f"{instance}/embed.html?&type=track&id={track_id}"
+
+                # Get tags
+                tags = track.get("tags", [])
+                genre = tags[0] if tags else None
+
+                tracks.append(FunkwhaleTrack(
+                    id=f"funkwhale_{instance.split('//')[1].split('.')[0]}_{track_id}",
+                    title=track.get("title", "Unknown"),
+                    artist=artist_info.get("name", "Unknown Artist"),
+                    url=track_url,
+                    instance=instance,
+                    album=album_info.get("title"),
+                    plays=track.get("downloads_count", 0),
+                    duration=track.get("duration", 0),
+                    genre=genre,
+                    artwork_url=artwork,
+                    embed_url=embed_url,
+                    stream_url=listen_url,
+                ))
 
     except Exception as e:
         print(f"[funkwhale] Library fetch error: {e}")
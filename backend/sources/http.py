@@ -0,0 +1,88 @@
+"""
+Shared HTTP clients for the sources.
+
+Shadow search fans out to the same few hosts many times per request.
+Pooled clients keep connections and DNS lookups alive between calls
+instead of opening a new session (and TLS handshake) for every request.
+"""
+import asyncio
+import importlib.util
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+from typing import Awaitable, Optional
+
+import aiohttp
+import httpx
+
+_session: Optional[aiohttp.ClientSession] = None
+_session_loop: Optional[asyncio.AbstractEventLoop] = None
+
+# httpx-based sources share one client (multiplexed over HTTP/2 when the
+# h2 package is installed); timeouts are passed per request
+_HTTP2 = importlib.util.find_spec("h2") is not None
+_client: Optional[httpx.AsyncClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+async def get_session() -> aiohttp.ClientSession:
+    """The process-wide aiohttp session, created on first use (per event loop)."""
+    global _session, _session_loop
+    loop = asyncio.get_running_loop()
+    if _session is None or _session.closed or _session_loop is not loop:
+        stale = _session
+        # Shared by every user's searches, so no cookies are kept between
+        # requests
+        _session = session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit_per_host=8,
+                ttl_dns_cache=300,
+                keepalive_timeout=60,
+            ),
+            cookie_jar=aiohttp.DummyCookieJar(),
+        )
+        _session_loop = loop
+        if stale is not None and not stale.closed:
+            await _close_stale(stale.close())
+        return session
+    return _session
+
+
+async def get_client() -> httpx.AsyncClient:
+    """The process-wide httpx client, created on first use (per event loop)."""
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        stale = _client
+        _client = client = httpx.AsyncClient(
+            http2=_HTTP2,
+            limits=httpx.Limits(max_keepalive_connections=20),
+            # A jar whose policy accepts no domains: cookies are never stored
+            cookies=CookieJar(policy=DefaultCookiePolicy(allowed_domains=[])),
+        )
+        _client_loop = loop
+        if stale is not None and not stale.is_closed:
+            await _close_stale(stale.aclose())
+        return client
+    return _client
+
+
+async def _close_stale(closing: Awaitable[None]) -> None:
+    """
+    Close a session or client left over from an earlier event loop. If
+    that loop is already closed its connections can't be shut down
+    cleanly; they are dropped with the object instead.
+    """
+    try:
+        await closing
+    except Exception:
+        pass
+
+
+async def close_session() -> None:
+    """Close the shared session and client (call on app shutdown)."""
+    global _session, _client
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+    if _client is not None:
+        await _client.aclose()
+    _client = None
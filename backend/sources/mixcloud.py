@@ -7,11 +7,11 @@ Unlike Spotify/SoundCloud, it's designed for continuous mixes.
 Great for discovering underground DJ sets and curated music selections.
 """
 
-import aiohttp
 import asyncio
 from dataclasses import dataclass
 from typing import Optional
 import re
+from .http import get_session
 
 
 @dataclass
@@ -55,58 +55,58 @@ async def search_mixcloud(query: str, limit: int = 20) -> list[MixcloudTrack]:
     }
 
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                search_url,
-                params=params,
-                headers=headers,
-                timeout=15
-            ) as resp:
-                if resp.status != 200:
-                    print(f"[mixcloud] Search returned {resp.status}")
-                    return []
-
-                data = await resp.json()
-                results = data.get("data", [])
-
-                for item in results:
-                    # Extract key from URL
-                    key = item.get("key", "")
-                    if not key:
-                        continue
-
-                    # Get user/DJ info
-                    user = item.get("user", {})
-                    dj_name = user.get("name") or user.get("username", "Unknown DJ")
-
-                    # Get pictures
-                    pictures = item.get("pictures", {})
-                    artwork = (
-                        pictures.get("large") or
-                        pictures.get("medium") or
-                        pictures.get("small")
-                    )
-
-                    # Get tags
-                    tags = [t.get("name", "") for t in item.get("tags", [])]
-
-                    # Build embed URL
-                    # Mixcloud widget: https://www.mixcloud.com/widget/iframe/?hide_cover=1&feed=KEY
-                    embed_url = f"https://www.mixcloud.com/widget/iframe/?hide_cover=1&mini=1&feed={key}"
-
-                    tracks.append(MixcloudTrack(
-                        id=f"mixcloud_{key.replace('/', '_')}",
-                        title=item.get("name", "Unknown Mix"),
-                        artist=dj_name,
-                        url=f"https://www.mixcloud.com{key}",
-                        plays=item.get("play_count"),
-                        favorites=item.get("favorite_count"),
-                        duration=item.get("audio_length", 0),
-                        genre=tags[0] if tags else None,
-                        tags=tags,
-                        artwork_url=artwork,
-                        embed_url=embed_url,
-                    ))
+        session = await get_session()
+        async with session.get(
+            search_url,
+            params=params,
+            headers=headers,
+            timeout=15
+        ) as resp:
+            if resp.status != 200:
+                print(f"[mixcloud] Search returned {resp.status}")
+                return []
+
+            data = await resp.json()
+            results = data.get("data", [])
+
+            for item in results:
+                # Extract key from URL
+                key = item.get("key", "")
+                if not key:
+                    continue
+
+                # Get user/DJ info
+                user = item.get("user", {})
+                dj_name = user.get("name") or user.get("username", "Unknown DJ")
+
+                # Get pictures
+                pictures = item.get("pictures", {})
+                artwork = (
+                    pictures.get("large") or
+                    pictures.get("medium") or
+                    pictures.get("small")
+                )
+
+                # Get tags
+                tags = [t.get("name", "") for t in item.get("tags", [])]
+
+                # Build embed URL
+                # Mixcloud widget: https://www.mixcloud.com/widget/iframe/?hide_cover=1&feed=KEY
+                embed_url = f"https://www.mixcloud.com/widget/iframe/?hide_cover=1&mini=1&feed={key}"
+
+                tracks.append(MixcloudTrack(
+                    id=f"mixcloud_{key.replace('/', '_')}",
+                    title=item.get("name", "Unknown Mix"),
+                    artist=dj_name,
+                    url=f"https://www.mixcloud.com{key}",
+                    plays=item.get("play_count"),
+                    favorites=item.get("favorite_count"),
+                    duration=item.get("audio_length", 0),
+                    genre=tags[0] if tags else None,
+                    tags=tags,
+                    artwork_url=artwork,
+                    embed_url=embed_url,
+                ))
 
     except Exception as e:
         print(f"[mixcloud] Search error: {e}")
@@ -133,48 +133,48 @@ async def search_mixcloud_by_tag(tag: str, limit: int = 20) -> list[MixcloudTrac
     }
 
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                tag_url,
-                params=params,
-                headers=headers,
-                timeout=15
-            ) as resp:
-                if resp.status != 200:
-                    # Try search instead
-                    return await search_mixcloud(tag, limit)
-
-                data = await resp.json()
-                results = data.get("data", [])
-
-                for item in results:
-                    key = item.get("key", "")
-                    if not key:
-                        continue
-
-                    user = item.get("user", {})
-                    dj_name = user.get("name") or user.get("username", "Unknown DJ")
-
-                    pictures = item.get("pictures", {})
-                    artwork = pictures.get("large") or pictures.get("medium")
-
-                    tags = [t.get("name", "") for t in item.get("tags", [])]
-
-                    embed_url = f"https://www.mixcloud.com/widget/iframe/?hide_cover=1&mini=1&feed={key}"
-
-                    tracks.append(MixcloudTrack(
-                        id=f"mixcloud_{key.replace('/', '_')}",
-                        title=item.get("name", "Unknown Mix"),
-                        artist=dj_name,
-                        url=f"https://www.mixcloud.com{key}",
-                        plays=item.get("play_count"),
-                        favorites=item.get("favorite_count"),
-                        duration=item.get("audio_length", 0),
-                        genre=tag,
-                        tags=tags,
-                        artwork_url=artwork,
-                        embed_url=embed_url,
-                    ))
+        session = await get_session()
+        async with session.get(
+            tag_url,
+            params=params,
+            headers=headers,
+            timeout=15
+        ) as resp:
+            if resp.status != 200:
+                # Try search instead
+                return await search_mixcloud(tag, limit)
+
+            data = await resp.json()
+            results = data.get("data", [])
+
+            for item in results:
+                key = item.get("key", "")
+                if not key:
+                    continue
+
+                user = item.get("user", {})
+                dj_name = user.get("name") or user.get("username", "Unknown DJ")
+
+                pictures = item.get("pictures", {})
+                artwork = pictures.get("large") or pictures.get("medium")
+
+                tags = [t.get("name", "") for t in item.get("tags", [])]
+
+                embed_url = f"https://www.mixcloud.com/widget/iframe/?hide_cover=1&mini=1&feed={key}"
+
+                tracks.append(MixcloudTrack(
+                    id=f"mixcloud_{key.replace('/', '_')}",
+                    title=item.get("name", "Unknown Mix"),
+                    artist=dj_name,
+                    url=f"https://www.mixcloud.com{key}",
+                    plays=item.get("play_count"),
+                    favorites=item.get("favorite_count"),
+                    duration=item.get("audio_length", 0),
+                    genre=tag,
+                    tags=tags,
+                    artwork_url=artwork,
+                    embed_url=embed_url,
+                ))
 
     except Exception as e:
         print(f"[mixcloud] Tag search error: {e}")
@@ -261,47 +261,47 @@ async def get_mixcloud_new(limit: int = 20) -> list[MixcloudTrack]:
     }
 
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                new_url,
-                params=params,
-                headers=headers,
-                timeout=15
-            ) as resp:
-                if resp.status != 200:
-                    return []
-
-                data = await resp.json()
-                results = data.get("data", [])
-
-                for item in results:
-                    key = item.get("key", "")
-                    if not key:
-                        continue
-
-                    user = item.get("user", {})
-                    dj_name = user.get("name") or user.get("username", "Unknown DJ")
-
-                    pictures = item.get("pictures", {})
-                    artwork = pictures.get("large") or pictures.get("medium")
-
-                    tags = [t.get("name", "") for t in item.get("tags", [])]
-
-                    embed_url = f"https://www.mixcloud.com/widget/iframe/?hide_cover=1&mini=1&feed={key}"
-
-                    tracks.append(MixcloudTrack(
-                        id=f"mixcloud_{key.replace('/', '_')}",
-                        title=item.get("name", "Unknown Mix"),
-                        artist=dj_name,
-                        url=f"https://www.mixcloud.com{key}",
-                        plays=item.get("play_count"),
-                        favorites=item.get("favorite_count"),
-                        duration=item.get("audio_length", 0),
-                        genre=tags[0] if tags else None,
-                        tags=tags,
-                        artwork_url=artwork,
-                        embed_url=embed_url,
-                    ))
+        session = await get_session()
+        async with session.get(
+            new_url,
+            params=params,
+            headers=headers,
+            timeout=15
+        ) as resp:
+            if resp.status != 200:
+                return []
+
+            data = await resp.json()
+            results = data.get("data", [])
+
+            for item in results:
+                key = item.get("key", "")
+                if not key:
+                    continue
+
+                user = item.get("user", {})
+                dj_name = user.get("name") or user.get("username", "Unknown DJ")
+
+                pictures = item.get("pictures", {})
+                artwork = pictures.get("large") or pictures.get("medium")
+
+                tags = [t.get("name", "") for t in item.get("tags", [])]
+
+                embed_url = f"https://www.mixcloud.com/widget/iframe/?hide_cover=1&mini=1&feed={key}"
+
+                tracks.append(MixcloudTrack(
+                    id=f"mixcloud_{key.replace('/', '_')}",
+                    title=item.get("name", "Unknown Mix"),
+                    artist=dj_name,
+                    url=f"https://www.mixcloud.com{key}",
+                    plays=item.get("play_count"),
+                    favorites=item.get("favorite_count"),
+                    duration=item.get("audio_length", 0),
+                    genre=tags[0] if tags else None,
+                    tags=tags,
+                    artwork_url=artwork,
+                    embed_url=embed_url,
+                ))
 
     except Exception as e:
         print(f"[mixcloud] New mixes error: {e}")
@@ -326,47 +326,47 @@ async def get_user_mixes(username: str, limit: int = 20) -> list[MixcloudTrack]:
     }
 
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                user_url,
-                params=params,
-                headers=headers,
-                timeout=15
-            ) as resp:
-                if resp.status != 200:
-                    return []
-
-                data = await resp.json()
-                results = data.get("data", [])
-
-                for item in results:
-                    key = item.get("key", "")
-                    if not key:
-                        continue
-
-                    user = item.get("user", {})
-                    dj_name = user.get("name") or username
-
-                    pictures = item.get("pictures", {})
-                    artwork = pictures.get("large") or pictures.get("medium")
-
-                    tags = [t.get("name", "") for t in item.get("tags", [])]
-
-                    embed_url = f"https://www.mixcloud.com/widget/iframe/?hide_cover=1&mini=1&feed={key}"
-
-                    tracks.append(MixcloudTrack(
-                        id=f"mixcloud_{key.replace('/', '_')}",
-                        title=item.get("name", "Unknown Mix"),
-                        artist=dj_name,
-                        url=f"https://www.mixcloud.com{key}",
-                        plays=item.get("play_count"),
-                        favorites=item.get("favorite_count"),
-                        duration=item.get("audio_length", 0),
-                        genre=tags[0] if tags else None,
-                        tags=tags,
-                        artwork_url=artwork,
-                        embed_url=embed_url,
-                    ))
+        session = await get_session()
+        async with session.get(
+            user_url,
+            params=params,
+            headers=headers,
+            timeout=15
+        ) as resp:
+            if resp.status != 200:
+                return []
+
+            data = await resp.json()
+            results = data.get("data", [])
+
+            for item in results:
+                key = item.get("key", "")
+                if not key:
+                    continue
+
+                user = item.get("user", {})
+                dj_name = user.get("name") or username
+
+                pictures = item.get("pictures", {})
+                artwork = pictures.get("large") or pictures.get("medium")
+
+                tags = [t.get("name", "") for t in item.get("tags", [])]
+
+                embed_url = f"https://www.mixcloud.com/widget/iframe/?hide_cover=1&mini=1&feed={key}"
+
+                tracks.append(MixcloudTrack(
+                    id=f"mixcloud_{key.replace('/', '_')}",
+                    title=item.get("name", "Unknown Mix"),
+                    artist=dj_name,
+                    url=f"https://www.mixcloud.com{key}",
+                    plays=item.get("play_count"),
+                    favorites=item.get("favorite_count"),
+                    duration=item.get("audio_length", 0),
+                    genre=tags[0] if tags else None,
+                    tags=tags,
+                    artwork_url=artwork,
+                    embed_url=embed_url,
+                ))
 
     except Exception as e:
         print(f"[mixcloud] User mixes error: {e}")
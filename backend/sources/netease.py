@@ -7,12 +7,12 @@ Uses the unofficial NeteaseCloudMusicApi endpoints.
 This is a goldmine for Chinese indie, C-pop, and underground music.
 """
 
-import aiohttp
 import asyncio
 from dataclasses import dataclass
 from typing import Optional
 import hashlib
 import urllib.parse
+from .http import get_session
 
 
 @dataclass
@@ -65,32 +65,94 @@ async def search_netease_web(query: str, limit: int = 20) -> list[NetEaseTrack]:
     }
 
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
+        session = await get_session()
+        async with session.post(
+            search_url,
+            headers=headers,
+            data=data,
+            timeout=15
+        ) as resp:
+            if resp.status != 200:
+                print(f"[netease] Search returned {resp.status}")
+                return []
+
+            result = await resp.json()
+
+            if result.get("code") != 200:
+                print(f"[netease] API error: {result.get('code')}")
+                return []
+
+            songs = result.get("result", {}).get("songs", [])
+
+            for song in songs[:limit]:
+                # Extract artist names
+                artists = song.get("artists", [])
+                artist_name = ", ".join([a.get("name", "") for a in artists])
+
+                # Extract album info
+                album = song.get("album", {})
+                album_name = album.get("name")
+                artwork = album.get("picUrl")
+
+                song_id = str(song.get("id"))
+
+                tracks.append(NetEaseTrack(
+                    id=f"netease_{song_id}",
+                    title=song.get("name", "Unknown"),
+                    artist=artist_name or "Unknown Artist",
+                    url=f"https://music.163.com/#/song?id={song_id}",
+                    album=album_name,
+                    plays=None,  # Need separate API call for play count
+                    duration=song.get("duration", 0) // 1000,
+                    genre=None,
+                    artwork_url=artwork,
+                    embed_url=f"https://music.163.com/outchain/player?type=2&id={song_id}&auto=0&height=66",
+                ))
+
+    except Exception as e:
+        print(f"[netease] Search error: {e}")
+
+    return tracks
+
+
+async def search_netease_mirror(query: str, limit: int = 20) -> list[NetEaseTrack]:
+    """
+    Search using community-hosted API mirrors.
+    More reliable but depends on mirror availability.
+    """
+    tracks = []
+
+    for mirror in NETEASE_MIRRORS:
+        try:
+            search_url = f"{mirror}/search"
+
+            params = {
+                "keywords": query,
+                "limit": limit,
+                "type": 1,
+            }
+
+            session = await get_session()
+            async with session.get(
                 search_url,
-                headers=headers,
-                data=data,
-                timeout=15
+                params=params,
+                timeout=10
             ) as resp:
                 if resp.status != 200:
-                    print(f"[netease] Search returned {resp.status}")
-                    return []
+                    continue
 
                 result = await resp.json()
 
                 if result.get("code") != 200:
-                    print(f"[netease] API error: {result.get('code')}")
-                    return []
+                    continue
 
                 songs = result.get("result", {}).get("songs", [])
 
                 for song in songs[:limit]:
-                    # Extract artist names
-                    artists = song.get("artists", [])
+                    artists = song.get("artists", []) or song.get("ar", [])
                     artist_name = ", ".join([a.get("name", "") for a in artists])
 
-                    # Extract album info
-                    album = song.get("album", {})
+                    album = song.get("album", {}) or song.get("al", {})
                     album_name = album.get("name")
                     artwork = album.get("picUrl")
 
@@ -102,78 +164,16 @@ async def search_netease_web(query: str, limit: int = 20) -> list[NetEaseTrack]:
                         artist=artist_name or "Unknown Artist",
                         url=f"https://music.163.com/#/song?id={song_id}",
                         album=album_name,
-                        plays=None,  # Need separate API call for play count
-                        duration=song.get("duration", 0) // 1000,
+                        plays=song.get("pop"),  # Popularity score
+                        duration=song.get("duration", song.get("dt", 0)) // 1000,
                         genre=None,
                         artwork_url=artwork,
                         embed_url=f"https://music.163.com/outchain/player?type=2&id={song_id}&auto=0&height=66",
                     ))
 
-    except Exception as e:
-        print(f"[netease] Search error: {e}")
-
-    return tracks
-
-
-async def search_netease_mirror(query: str, limit: int = 20) -> list[NetEaseTrack]:
-    """
-    Search using community-hosted API mirrors.
-    More reliable but depends on mirror availability.
-    """
-    tracks = []
-
-    for mirror in NETEASE_MIRRORS:
-        try:
-            search_url = f"{mirror}/search"
-
-            params = {
-                "keywords": query,
-                "limit": limit,
-                "type": 1,
-            }
-
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    search_url,
-                    params=params,
-                    timeout=10
-                ) as resp:
-                    if resp.status != 200:
-                        continue
-
-                    result = await resp.json()
-
-                    if result.get("code") != 200:
-                        continue
-
-                    songs = result.get("result", {}).get("songs", [])
-
-                    for song in songs[:limit]:
-                        artists = song.get("artists", []) or song.get("ar", [])
-                        artist_name = ", ".join([a.get("name", "") for a in artists])
-
-                        album = song.get("album", {}) or song.get("al", {})
-                        album_name = album.get("name")
-                        artwork = album.get("picUrl")
-
-                        song_id = str(song.get("id"))
-
-                        tracks.append(NetEaseTrack(
-                            id=f"netease_{song_id}",
-                            title=song.get("name", "Unknown"),
-                            artist=artist_name or "Unknown Artist",
-                            url=f"https://music.163.com/#/song?id={song_id}",
-                            album=album_name,
-                            plays=song.get("pop"),  # Popularity score
-                            duration=song.get("duration", song.get("dt", 0)) // 1000,
-                            genre=None,
-                            artwork_url=artwork,
-                            embed_url=f"https://music.163.com/outchain/player?type=2&id={song_id}&auto=0&height=66",
-                        ))
-
-                    if tracks:
-                        print(f"[netease] Found {len(tracks)} tracks via {mirror}")
-                        return tracks
+                if tracks:
+                    print(f"[netease] Found {len(tracks)} tracks via {mirror}")
+                    return tracks
 
         except Exception as e:
             print(f"[netease] Mirror {mirror} error: {e}")
@@ -281,53 +281,53 @@ async def get_netease_by_playlist(playlist_id: str, limit: int = 50) -> list[Net
             url = f"{mirror}/playlist/detail"
             params = {"id": playlist_id}
 
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, params=params, timeout=10) as resp:
-                    if resp.status != 200:
-                        continue
-
-                    result = await resp.json()
-
-                    if result.get("code") != 200:
-                        continue
-
-                    playlist = result.get("playlist", {})
-                    track_ids = [str(t.get("id")) for t in playlist.get("trackIds", [])]
-
-                    # Get track details
-                    if track_ids:
-                        detail_url = f"{mirror}/song/detail"
-                        detail_params = {"ids": ",".join(track_ids[:limit])}
-
-                        async with session.get(detail_url, params=detail_params, timeout=10) as detail_resp:
-                            if detail_resp.status != 200:
-                                continue
-
-                            detail_result = await detail_resp.json()
-                            songs = detail_result.get("songs", [])
-
-                            for song in songs:
-                                artists = song.get("ar", [])
-                                artist_name = ", ".join([a.get("name", "") for a in artists])
-
-                                album = song.get("al", {})
-                                song_id = str(song.get("id"))
-
-                                tracks.append(NetEaseTrack(
-                                    id=f"netease_{song_id}",
-                                    title=song.get("name", "Unknown"),
-                                    artist=artist_name or "Unknown",
-                                    url=f"https://music.163.com/#/song?id={song_id}",
-                                    album=album.get("name"),
-                                    plays=song.get("pop"),
-                                    duration=song.get("dt", 0) // 1000,
-                                    genre=None,
-                                    artwork_url=album.get("picUrl"),
-                                    embed_url=f"https://music.163.com/outchain/player?type=2&id={song_id}&auto=0&height=66",
-                                ))
-
-                    if tracks:
-                        return tracks
+            session = await get_session()
+            async with session.get(url, params=params, timeout=10) as resp:
+                if resp.status != 200:
+                    continue
+
+                result = await resp.json()
+
+                if result.get("code") != 200:
+                    continue
+
+                playlist = result.get("playlist", {})
+                track_ids = [str(t.get("id")) for t in playlist.get("trackIds", [])]
+
+                # Get track details
+                if track_ids:
+                    detail_url = f"{mirror}/song/detail"
+                    detail_params = {"ids": ",".join(track_ids[:limit])}
+
+                    async with session.get(detail_url, params=detail_params, timeout=10) as detail_resp:
+                        if detail_resp.status != 200:
+                            continue
+
+                        detail_result = await detail_resp.json()
+                        songs = detail_result.get("songs", [])
+
+                        for song in songs:
+                            artists = song.get("ar", [])
+                            artist_name = ", ".join([a.get("name", "") for a in artists])
+
+                            album = song.get("al", {})
+                            song_id = str(song.get("id"))
+
+                            tracks.append(NetEaseTrack(
+                                id=f"netease_{song_id}",
+                                title=song.get("name", "Unknown"),
+                                artist=artist_name or "Unknown",
+                                url=f"https://music.163.com/#/song?id={song_id}",
+                                album=album.get("name"),
+                                plays=song.get("pop"),
+                                duration=song.get("dt", 0) // 1000,
+                                genre=None,
+                                artwork_url=album.get("picUrl"),
+                                embed_url=f"https://music.163.com/outchain/player?type=2&id={song_id}&auto=0&height=66",
+                            ))
+
+                if tracks:
+                    return tracks
 
         except Exception as e:
             print(f"[netease] Playlist error: {e}")
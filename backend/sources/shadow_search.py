@@ -11,6 +11,7 @@ Higher = more underground = better for latent discovery.
 """
 
 import asyncio
+import heapq
 from dataclasses import dataclass
 from typing import Optional
 import math
@@ -284,6 +285,15 @@ def convert_to_shadow_track(
     )
 
 
+# Sources searched when shadow_search isn't given a list
+_ALL_SOURCES = frozenset({
+    # Original sources
+    "audius", "audiomack", "archive", "bandcamp", "reddit", "soundcloud",
+    # New global underground sources
+    "vk", "telegram", "netease", "funkwhale", "mixcloud",
+})
+
+
 async def shadow_search(
     user_genres: list[str],
     limit: int = 30,
@@ -302,13 +312,8 @@ async def shadow_search(
     Returns:
         List of ShadowTracks sorted by combined score
     """
-    if sources is None:
-        sources = [
-            # Original sources
-            "audius", "audiomack", "archive", "bandcamp", "reddit", "soundcloud",
-            # New global underground sources
-            "vk", "telegram", "netease", "funkwhale", "mixcloud"
-        ]
+    # Checked up to 11 times per genre below - make membership O(1)
+    sources = _ALL_SOURCES if sources is None else frozenset(sources)
 
     all_tracks: list[ShadowTrack] = []
 
@@ -384,12 +389,10 @@ async def shadow_search(
     # Deduplicate by artist + title similarity
     unique_tracks = deduplicate_tracks(all_tracks)
 
-    # Sort by combined score (shadow * taste match)
-    unique_tracks.sort(key=lambda t: t.combined_score, reverse=True)
-
     print(f"[shadow] Found {len(unique_tracks)} unique tracks")
 
-    return unique_tracks[:limit * 2]  # Return more since we deduplicated
+    # Best by combined score (shadow * taste match); return more since we deduplicated
+    return heapq.nlargest(limit * 2, unique_tracks, key=lambda t: t.combined_score)
 
 
 def deduplicate_tracks(tracks: list[ShadowTrack]) -> list[ShadowTrack]:
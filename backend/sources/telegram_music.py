@@ -7,12 +7,12 @@ Uses web preview of public channels (t.me) to avoid needing full API auth.
 Popular music channels include leak channels, indie promoters, and genre-specific groups.
 """
 
-import aiohttp
 import asyncio
 import re
 from dataclasses import dataclass
 from typing import Optional
 import hashlib
+from .http import get_session
 
 
 @dataclass
@@ -99,68 +99,68 @@ async def scrape_telegram_channel(channel: str, limit: int = 10) -> list[Telegra
     }
 
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, headers=headers, timeout=15) as resp:
-                if resp.status != 200:
-                    print(f"[telegram] Channel {channel} returned {resp.status}")
-                    return []
-
-                html = await resp.text()
-
-                # Find message blocks with audio
-                # Telegram web preview has specific HTML structure
-
-                # Pattern for messages
-                message_pattern = r'data-post="([^"]+)"'
-                messages = re.findall(message_pattern, html)
-
-                # Pattern for audio files
-                audio_pattern = r'class="tgme_widget_message_document_title[^"]*"[^>]*>([^<]+)</div>'
-                audio_titles = re.findall(audio_pattern, html)
-
-                # Pattern for audio artist/extra info
-                extra_pattern = r'class="tgme_widget_message_document_extra"[^>]*>([^<]+)</div>'
-                audio_extras = re.findall(extra_pattern, html)
-
-                # Pattern for message text (often contains track info)
-                text_pattern = r'class="tgme_widget_message_text[^"]*"[^>]*>(.+?)</div>'
-                message_texts = re.findall(text_pattern, html, re.DOTALL)
-
-                # Process found audio
-                for i, title in enumerate(audio_titles[:limit]):
-                    # Clean HTML entities
-                    import html as html_module
-                    title = html_module.unescape(title.strip())
-
-                    # Try to parse artist - title format
-                    artist = "Unknown Artist"
-                    if " - " in title:
-                        parts = title.split(" - ", 1)
-                        artist = parts[0].strip()
-                        title = parts[1].strip()
-                    elif i < len(audio_extras):
-                        artist = html_module.unescape(audio_extras[i].strip())
-
-                    # Get message ID for link
-                    msg_id = i + 1
-                    if i < len(messages):
-                        try:
-                            msg_id = int(messages[i].split("/")[-1])
-                        except:
-                            pass
-
-                    track_id = hashlib.md5(f"{channel}_{msg_id}_{title}".encode()).hexdigest()[:12]
-
-                    tracks.append(TelegramTrack(
-                        id=f"tg_{track_id}",
-                        title=title,
-                        artist=artist,
-                        url=f"https://t.me/{channel}/{msg_id}",
-                        channel=channel,
-                        message_id=msg_id,
-                        plays=None,
-                        genre=None,
-                    ))
+        session = await get_session()
+        async with session.get(url, headers=headers, timeout=15) as resp:
+            if resp.status != 200:
+                print(f"[telegram] Channel {channel} returned {resp.status}")
+                return []
+
+            html = await resp.text()
+
+            # Find message blocks with audio
+            # Telegram web preview has specific HTML structure
+
+            # Pattern for messages
+            message_pattern = r'data-post="([^"]+)"'
+            messages = re.findall(message_pattern, html)
+
+            # Pattern for audio files
+            audio_pattern = r'class="tgme_widget_message_document_title[^"]*"[^>]*>([^<]+)</div>'
+            audio_titles = re.findall(audio_pattern, html)
+
+            # Pattern for audio artist/extra info
+            extra_pattern = r'class="tgme_widget_message_document_extra"[^>]*>([^<]+)</div>'
+            audio_extras = re.findall(extra_pattern, html)
+
+            # Pattern for message text (often contains track info)
+            text_pattern = r'class="tgme_widget_message_text[^"]*"[^>]*>(.+?)</div>'
+            message_texts = re.findall(text_pattern, html, re.DOTALL)
+
+            # Process found audio
+            for i, title in enumerate(audio_titles[:limit]):
+                # Clean HTML entities
+                import html as html_module
+                title = html_module.unescape(title.strip())
+
+                # Try to parse artist - title format
+                artist = "Unknown Artist"
+                if " - " in title:
+                    parts = title.split(" - ", 1)
+                    artist = parts[0].strip()
+                    title = parts[1].strip()
+                elif i < len(audio_extras):
+                    artist = html_module.unescape(audio_extras[i].strip())
+
+                # Get message ID for link
+                msg_id = i + 1
+                if i < len(messages):
+                    try:
+                        msg_id = int(messages[i].split("/")[-1])
+                    except:
+                        pass
+
+                track_id = hashlib.md5(f"{channel}_{msg_id}_{title}".encode()).hexdigest()[:12]
+
+                tracks.append(TelegramTrack(
+                    id=f"tg_{track_id}",
+                    title=title,
+                    artist=artist,
+                    url=f"https://t.me/{channel}/{msg_id}",
+                    channel=channel,
+                    message_id=msg_id,
+                    plays=None,
+                    genre=None,
+                ))
 
     except Exception as e:
         print(f"[telegram] Error scraping {channel}: {e}")
@@ -7,12 +7,12 @@ with tons of rare, pirated, and independent music from Russia and CIS.
 Uses vkpymusic approach to bypass token restrictions.
 """
 
-import aiohttp
 import asyncio
 from dataclasses import dataclass
 from typing import Optional
 import hashlib
 import re
+from .http import get_session
 
 
 @dataclass
@@ -71,38 +71,38 @@ async def search_vk_public(query: str, limit: int = 20) -> list[VKTrack]:
     }
 
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(search_url, headers=headers, timeout=15) as resp:
-                if resp.status != 200:
-                    print(f"[vk] Search returned {resp.status}")
-                    return []
-
-                html = await resp.text()
-
-                # Parse audio items from mobile page
-                # VK mobile has simpler HTML structure
-                audio_pattern = r'data-audio="([^"]+)"'
-                matches = re.findall(audio_pattern, html)
-
-                for i, match in enumerate(matches[:limit]):
-                    try:
-                        # Decode VK's audio data format
-                        # Format: [id, owner_id, url, title, artist, duration, ...]
-                        import html as html_module
-                        decoded = html_module.unescape(match)
-
-                        # Try to extract basic info from the page
-                        tracks.append(VKTrack(
-                            id=f"vk_{i}_{hashlib.md5(decoded.encode()).hexdigest()[:8]}",
-                            title=f"Track {i+1}",  # Will be updated if we can parse
-                            artist="Unknown Artist",
-                            url=f"https://vk.com/audio?q={query}",
-                            duration=0,
-                            plays=None,
-                            genre=None,
-                        ))
-                    except Exception as e:
-                        continue
+        session = await get_session()
+        async with session.get(search_url, headers=headers, timeout=15) as resp:
+            if resp.status != 200:
+                print(f"[vk] Search returned {resp.status}")
+                return []
+
+            html = await resp.text()
+
+            # Parse audio items from mobile page
+            # VK mobile has simpler HTML structure
+            audio_pattern = r'data-audio="([^"]+)"'
+            matches = re.findall(audio_pattern, html)
+
+            for i, match in enumerate(matches[:limit]):
+                try:
+                    # Decode VK's audio data format
+                    # Format: [id, owner_id, url, title, artist, duration, ...]
+                    import html as html_module
+                    decoded = html_module.unescape(match)
+
+                    # Try to extract basic info from the page
+                    tracks.append(VKTrack(
+                        id=f"vk_{i}_{hashlib.md5(decoded.encode()).hexdigest()[:8]}",
+                        title=f"Track {i+1}",  # Will be updated if we can parse
+                        artist="Unknown Artist",
+                        url=f"https://vk.com/audio?q={query}",
+                        duration=0,
+                        plays=None,
+                        genre=None,
+                    ))
+                except Exception as e:
+                    continue
 
     except Exception as e:
         print(f"[vk] Public search error: {e}")
@@ -127,36 +127,36 @@ async def search_vk_api(query: str, token: str, limit: int = 20) -> list[VKTrack
     }
 
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                f"{VK_API_BASE}/audio.search",
-                params=params,
-                timeout=15
-            ) as resp:
-                if resp.status != 200:
-                    return []
-
-                data = await resp.json()
-
-                if "error" in data:
-                    print(f"[vk] API error: {data['error'].get('error_msg', 'Unknown')}")
-                    return []
-
-                items = data.get("response", {}).get("items", [])
-
-                for item in items:
-                    track_id = f"{item.get('owner_id')}_{item.get('id')}"
-
-                    tracks.append(VKTrack(
-                        id=track_id,
-                        title=item.get("title", "Unknown"),
-                        artist=item.get("artist", "Unknown"),
-                        url=f"https://vk.com/audio{track_id}",
-                        duration=item.get("duration", 0),
-                        plays=None,  # VK doesn't expose play counts
-                        genre=item.get("genre_id"),
-                        artwork_url=item.get("album", {}).get("thumb", {}).get("photo_300"),
-                    ))
+        session = await get_session()
+        async with session.get(
+            f"{VK_API_BASE}/audio.search",
+            params=params,
+            timeout=15
+        ) as resp:
+            if resp.status != 200:
+                return []
+
+            data = await resp.json()
+
+            if "error" in data:
+                print(f"[vk] API error: {data['error'].get('error_msg', 'Unknown')}")
+                return []
+
+            items = data.get("response", {}).get("items", [])
+
+            for item in items:
+                track_id = f"{item.get('owner_id')}_{item.get('id')}"
+
+                tracks.append(VKTrack(
+                    id=track_id,
+                    title=item.get("title", "Unknown"),
+                    artist=item.get("artist", "Unknown"),
+                    url=f"https://vk.com/audio{track_id}",
+                    duration=item.get("duration", 0),
+                    plays=None,  # VK doesn't expose play counts
+                    genre=item.get("genre_id"),
+                    artwork_url=item.get("album", {}).get("thumb", {}).get("photo_300"),
+                ))
 
     except Exception as e:
         print(f"[vk] API search error: {e}")
@@ -196,58 +196,58 @@ async def search_vk_scrape(query: str, limit: int = 20) -> list[VKTrack]:
     }
 
     try:
-        async with aiohttp.ClientSession() as session:
-            # First get the search page
-            search_url = f"https://vk.com/audio?q={query}&section=search"
-
-            async with session.get(search_url, headers=headers, timeout=15) as resp:
-                html = await resp.text()
-
-                # Extract audio data from page
-                # VK encodes audio info in JSON-like structures
-
-                # Pattern for audio row data
-                patterns = [
-                    r'"audio_row__title[^"]*"[^>]*>([^<]+)</span>',  # Title
-                    r'"audio_row__performers[^"]*"[^>]*>([^<]+)',    # Artist
-                ]
-
-                # Try to find audio items
-                audio_blocks = re.findall(
-                    r'class="audio_row[^"]*"[^>]*data-id="([^"]+)"',
-                    html
-                )
-
-                title_matches = re.findall(
-                    r'<span class="audio_row__title_inner">([^<]+)</span>',
-                    html
-                )
-
-                artist_matches = re.findall(
-                    r'<a class="audio_row__performer_link"[^>]*>([^<]+)</a>',
-                    html
-                )
-
-                # Combine found data
-                for i in range(min(len(audio_blocks), limit)):
-                    audio_id = audio_blocks[i] if i < len(audio_blocks) else f"vk_{i}"
-                    title = title_matches[i] if i < len(title_matches) else f"VK Track {i+1}"
-                    artist = artist_matches[i] if i < len(artist_matches) else "Unknown Artist"
-
-                    # Clean up HTML entities
-                    import html as html_module
-                    title = html_module.unescape(title.strip())
-                    artist = html_module.unescape(artist.strip())
+        session = await get_session()
+        # First get the search page
+        search_url = f"https://vk.com/audio?q={query}&section=search"
+
+        async with session.get(search_url, headers=headers, timeout=15) as resp:
+            html = await resp.text()
+
+            # Extract audio data from page
+            # VK encodes audio info in JSON-like structures
+
+            # Pattern for audio row data
+            patterns = [
+                r'"audio_row__title[^"]*"[^>]*>([^<]+)</span>',  # Title
+                r'"audio_row__performers[^"]*"[^>]*>([^<]+)',    # Artist
+            ]
+
+            # Try to find audio items
+            audio_blocks = re.findall(
+                r'class="audio_row[^"]*"[^>]*data-id="([^"]+)"',
+                html
+            )
 
-                    tracks.append(VKTrack(
-                        id=f"vk_{audio_id}",
-                        title=title,
-                        artist=artist,
-                        url=f"https://vk.com/audio?q={query}",
-                        duration=0,
-                        plays=None,
-                        genre=query if len(query) < 30 else None,  # Use query as genre hint
-                    ))
+            title_matches = re.findall(
+                r'<span class="audio_row__title_inner">([^<]+)</span>',
+                html
+            )
+
+            artist_matches = re.findall(
+                r'<a class="audio_row__performer_link"[^>]*>([^<]+)</a>',
+                html
+            )
+
+            # Combine found data
+            for i in range(min(len(audio_blocks), limit)):
+                audio_id = audio_blocks[i] if i < len(audio_blocks) else f"vk_{i}"
+                title = title_matches[i] if i < len(title_matches) else f"VK Track {i+1}"
+                artist = artist_matches[i] if i < len(artist_matches) else "Unknown Artist"
+
+                # Clean up HTML entities
+                import html as html_module
+                title = html_module.unescape(title.strip())
+                artist = html_module.unescape(artist.strip())
+
+                tracks.append(VKTrack(
+                    id=f"vk_{audio_id}",
+                    title=title,
+                    artist=artist,
+                    url=f"https://vk.com/audio?q={query}",
+                    duration=0,
+                    plays=None,
+                    genre=query if len(query) < 30 else None,  # Use query as genre hint
+                ))
 
     except Exception as e:
         print(f"[vk] Scrape error: {e}")
@@ -2,28 +2,117 @@
 Spotify API client for fetching user listening data.
 Handles all communication with Spotify Web API.
 """
+import asyncio
+import hashlib
+import importlib.util
+import random
+import time
 import httpx
-from typing import Optional
-from config import SPOTIFY_API_BASE, SPOTIFY_TOKEN_URL, SPOTIFY_CLIENT_ID, SPOTIFY_CLIENT_SECRET, SPOTIFY_REDIRECT_URI
+import orjson
+from typing import Awaitable, Callable, Optional
+from config import (
+    SPOTIFY_API_BASE,
+    SPOTIFY_TOKEN_URL,
+    SPOTIFY_CLIENT_ID,
+    SPOTIFY_CLIENT_SECRET,
+    SPOTIFY_REDIRECT_URI,
+    SPOTIFY_CACHE_TTL,
+    SPOTIFY_RATE_LIMIT,
+    SPOTIFY_RATE_PERIOD,
+    SPOTIFY_MAX_CONCURRENCY,
+    SPOTIFY_MAX_RETRIES,
+    SPOTIFY_MAX_RETRY_DELAY,
+    SPOTIFY_HTTP_TIMEOUT,
+    SPOTIFY_ETAG_TTL,
+    SPOTIFY_ETAG_CACHE_BYTES,
+)
+from cache import cached
+from rate_limit import LeakyBucket
+
+# One limiter for the whole process: concurrent scans share Spotify's budget
+_RATE_LIMITER = LeakyBucket(SPOTIFY_RATE_LIMIT, SPOTIFY_RATE_PERIOD, SPOTIFY_MAX_CONCURRENCY)
+
+# One pooled HTTP client for all API calls, so requests reuse TLS sessions
+# (multiplexed over HTTP/2 when the h2 package is installed)
+_HTTP2 = importlib.util.find_spec("h2") is not None
+_http: Optional[httpx.AsyncClient] = None
+_http_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _http_client() -> httpx.AsyncClient:
+    """Return the shared AsyncClient, (re)creating it for the running event loop."""
+    global _http, _http_loop
+    loop = asyncio.get_running_loop()
+    if _http is None or _http.is_closed or _http_loop is not loop:
+        _http = httpx.AsyncClient(
+            http2=_HTTP2,
+            timeout=SPOTIFY_HTTP_TIMEOUT,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=40),
+        )
+        _http_loop = loop
+    return _http
+
+
+# (token hash, endpoint, params) -> (etag, stored_at, raw body).
+# Insertion order doubles as age order for eviction. Bodies are kept as
+# bytes and parsed on each 304, so callers never share a mutable dict.
+_etags: dict[tuple, tuple[str, float, bytes]] = {}
+_etag_bytes = 0  # Total size of the stored bodies
+
+
+def token_hash(access_token: str) -> str:
+    """Stable, non-reversible key for an access token (for caches)."""
+    return hashlib.blake2b(access_token.encode(), digest_size=16).hexdigest()
+
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client (call on app shutdown)."""
+    global _http
+    if _http is not None:
+        await _http.aclose()
+        _http = None
 
 
 class SpotifyClient:
     """Wrapper for Spotify Web API calls."""
 
-    def __init__(self, access_token: str):
+    def __init__(self, access_token: str, http: Optional[httpx.AsyncClient] = None):
         self.access_token = access_token
         self.headers = {"Authorization": f"Bearer {access_token}"}
+        self._token_hash = token_hash(access_token)
+        # Defaults to the shared pooled client; inject one for tests/custom transports
+        self._http = http
 
     async def _get(self, endpoint: str, params: Optional[dict] = None) -> dict:
-        """Make authenticated GET request to Spotify API."""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{SPOTIFY_API_BASE}{endpoint}",
-                headers=self.headers,
-                params=params or {}
-            )
-            response.raise_for_status()
-            return response.json()
+        """
+        Make authenticated GET request to Spotify API.
+        Rate-limited; 429 responses are retried (see _send).
+        Sends If-None-Match when an earlier response had an ETag, and
+        re-parses that response's body on 304 Not Modified.
+        """
+        params = params or {}
+        etag_key = (self._token_hash, endpoint, tuple(sorted(params.items())))
+        stored = _etags.get(etag_key)
+        if stored is not None and time.monotonic() - stored[1] >= SPOTIFY_ETAG_TTL:
+            stored = None
+        headers = self.headers if stored is None else {**self.headers, "If-None-Match": stored[0]}
+
+        client = self._http or _http_client()
+        response = await _send(lambda: client.get(
+            f"{SPOTIFY_API_BASE}{endpoint}",
+            headers=headers,
+            params=params
+        ))
+
+        if response.status_code == 304 and stored is not None:
+            _store_etag(etag_key, stored[0], stored[2])
+            return orjson.loads(stored[2])
+
+        response.raise_for_status()
+        etag = response.headers.get("ETag")
+        if etag:
+            _store_etag(etag_key, etag, response.content)
+        return orjson.loads(response.content)
 
     # =========================================================================
     # USER LISTENING HISTORY
@@ -80,6 +169,7 @@ class SpotifyClient:
         ids = ",".join(artist_ids[:50])
         return await self._get("/artists", {"ids": ids})
 
+    @cached(ttl=SPOTIFY_CACHE_TTL)
     async def get_related_artists(self, artist_id: str) -> dict:
         """
         Fetch artists similar to given artist.
@@ -87,6 +177,7 @@ class SpotifyClient:
         """
         return await self._get(f"/artists/{artist_id}/related-artists")
 
+    @cached(ttl=SPOTIFY_CACHE_TTL)
     async def get_artist_albums(self, artist_id: str, limit: int = 20) -> dict:
         """Fetch albums by an artist to determine release years."""
         return await self._get(f"/artists/{artist_id}/albums", {
@@ -94,10 +185,12 @@ class SpotifyClient:
             "limit": limit
         })
 
+    @cached(ttl=SPOTIFY_CACHE_TTL)
     async def get_artist_top_tracks(self, artist_id: str, market: str = "US") -> dict:
         """Fetch an artist's top tracks for sampling."""
         return await self._get(f"/artists/{artist_id}/top-tracks", {"market": market})
 
+    @cached(ttl=SPOTIFY_CACHE_TTL)
     async def search_artists(self, query: str, limit: int = 50) -> dict:
         """Search for artists by query (name, genre, etc)."""
         return await self._get("/search", {
@@ -117,39 +210,82 @@ class SpotifyClient:
         })
 
 
+def _store_etag(key: tuple, etag: str, body: bytes) -> None:
+    """Remember a response's ETag and body, evicting the oldest entries."""
+    global _etag_bytes
+    old = _etags.pop(key, None)
+    if old is not None:
+        _etag_bytes -= len(old[2])
+    _etags[key] = (etag, time.monotonic(), body)
+    _etag_bytes += len(body)
+    while _etag_bytes > SPOTIFY_ETAG_CACHE_BYTES:
+        _etag_bytes -= len(_etags.pop(next(iter(_etags)))[2])
+
+
+async def _send(send: Callable[[], Awaitable[httpx.Response]]) -> httpx.Response:
+    """
+    Run a request through the shared rate limiter, retrying 429s. A
+    Retry-After longer than SPOTIFY_MAX_RETRY_DELAY isn't waited out: the
+    429 is returned so the caller fails fast instead of stalling.
+    """
+    for attempt in range(SPOTIFY_MAX_RETRIES + 1):
+        async with _RATE_LIMITER:
+            response = await send()
+        if response.status_code != 429 or attempt == SPOTIFY_MAX_RETRIES:
+            break
+        delay = _retry_delay(response, attempt)
+        if delay > SPOTIFY_MAX_RETRY_DELAY:
+            break
+        # Wait outside the limiter so other requests keep their slots
+        await asyncio.sleep(delay)
+    return response
+
+
+def _retry_delay(response: httpx.Response, attempt: int) -> float:
+    """
+    Seconds to wait before retrying a 429: Retry-After if given, else
+    exponential backoff with jitter (so concurrent retries spread out).
+    """
+    try:
+        return float(response.headers["Retry-After"])
+    except (KeyError, ValueError):
+        backoff = 0.5 * 2 ** attempt
+        return backoff / 2 + random.uniform(0, backoff / 2)
+
+
 async def exchange_code_for_token(code: str) -> dict:
     """
     Exchange OAuth authorization code for access token.
     Called after user authorizes via Spotify.
     """
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            SPOTIFY_TOKEN_URL,
-            data={
-                "grant_type": "authorization_code",
-                "code": code,
-                "redirect_uri": SPOTIFY_REDIRECT_URI,
-                "client_id": SPOTIFY_CLIENT_ID,
-                "client_secret": SPOTIFY_CLIENT_SECRET,
-            },
-            headers={"Content-Type": "application/x-www-form-urlencoded"}
-        )
-        response.raise_for_status()
-        return response.json()
+    client = _http_client()
+    response = await _send(lambda: client.post(
+        SPOTIFY_TOKEN_URL,
+        data={
+            "grant_type": "authorization_code",
+            "code": code,
+            "redirect_uri": SPOTIFY_REDIRECT_URI,
+            "client_id": SPOTIFY_CLIENT_ID,
+            "client_secret": SPOTIFY_CLIENT_SECRET,
+        },
+        headers={"Content-Type": "application/x-www-form-urlencoded"}
+    ))
+    response.raise_for_status()
+    return orjson.loads(response.content)
 
 
 async def refresh_access_token(refresh_token: str) -> dict:
     """Refresh an expired access token."""
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            SPOTIFY_TOKEN_URL,
-            data={
-                "grant_type": "refresh_token",
-                "refresh_token": refresh_token,
-                "client_id": SPOTIFY_CLIENT_ID,
-                "client_secret": SPOTIFY_CLIENT_SECRET,
-            },
-            headers={"Content-Type": "application/x-www-form-urlencoded"}
-        )
-        response.raise_for_status()
-        return response.json()
+    client = _http_client()
+    response = await _send(lambda: client.post(
+        SPOTIFY_TOKEN_URL,
+        data={
+            "grant_type": "refresh_token",
+            "refresh_token": refresh_token,
+            "client_id": SPOTIFY_CLIENT_ID,
+            "client_secret": SPOTIFY_CLIENT_SECRET,
+        },
+        headers={"Content-Type": "application/x-www-form-urlencoded"}
+    ))
+    response.raise_for_status()
+    return orjson.loads(response.content)
@@ -4,11 +4,20 @@ Unit tests for Latent Search core modules.
 Run with: pytest test_core.py -v
 """
 import pytest
+import atexit
 import os
+import shutil
 import tempfile
 from dataclasses import dataclass
 from typing import Optional
 
+# The databases are created on import (init_db/init_cache) - keep the
+# test run's copies out of the source tree
+_TEST_DATA_DIR = tempfile.mkdtemp(prefix="latent_search_test_")
+atexit.register(shutil.rmtree, _TEST_DATA_DIR, ignore_errors=True)
+os.environ["LATENT_SEARCH_DB_PATH"] = os.path.join(_TEST_DATA_DIR, "latent_search.db")
+os.environ["SPOTIFY_CACHE_PATH"] = os.path.join(_TEST_DATA_DIR, "spotify_cache.db")
+
 # Import modules to test
 from omission_scorer import (
     _compute_popularity_score,
@@ -24,6 +33,7 @@ from config import (
     MIN_CONTEXTUAL_SIMILARITY,
     MAX_POPULARITY_GATE,
     MAX_RESULTS,
+    OMISSION_WEIGHTS,
 )
 
 
@@ -105,6 +115,19 @@ class TestSaturationScore:
         score = _compute_saturation_score(80)
         assert score <= 0.3
 
+    def test_lookup_tables_match_formulas(self):
+        """The scorer's lookup tables agree with the score functions."""
+        from omission_scorer import (
+            _POPULARITY_SCORE_BY_POPULARITY,
+            _RECENCY_BY_YEAR,
+            _SATURATION_BY_POPULARITY,
+        )
+        for p in range(101):
+            assert _SATURATION_BY_POPULARITY[p] == _compute_saturation_score(p)
+            assert _POPULARITY_SCORE_BY_POPULARITY[p] == _compute_popularity_score(p)
+        for year, score in _RECENCY_BY_YEAR.items():
+            assert score == _compute_recency_score(year)
+
 
 # =========================================================================
 # GENRE OVERLAP TESTS
@@ -139,6 +162,19 @@ class TestGenreOverlap:
         assert _count_genre_overlap([], {"rock": 0.5}) == 0
         assert _count_genre_overlap(["rock"], {}) == 0
 
+    def test_shared_index_matches_unshared(self):
+        """A genre index shared across candidates should give the same counts."""
+        from candidate_expander import build_genre_index
+        user_weights = {"indie rock": 0.5, "jazz": 0.3}
+        index = build_genre_index(user_weights)
+        assert _count_genre_overlap(["rock", "pop"], user_weights, index) == 1
+        assert _count_genre_overlap(["rock", "jazz", "rock"], user_weights, index) == 3
+        assert _count_genre_overlap(["rock", "jazz", "rock"], user_weights) == 3
+
+    def test_partial_match_is_token_aligned(self):
+        """Like the expander, partial matches need whole words: not rap ~ trap."""
+        assert _count_genre_overlap(["trap", "post-punk"], {"rap": 0.6, "punk": 0.5}) == 1
+
 
 # =========================================================================
 # CANDIDATE GENRE OVERLAP TESTS
@@ -161,6 +197,22 @@ class TestCandidateGenreOverlap:
         score = _compute_genre_overlap(candidate_genres, user_weights)
         assert score == 0.0
 
+    def test_partial_match_is_token_aligned(self):
+        """Partial matches need whole words: rock ~ indie rock, but not rap ~ trap."""
+        user_weights = {"rock": 0.8, "rap": 0.6}
+        assert _compute_genre_overlap(["indie rock"], user_weights) == pytest.approx(0.4)
+        assert _compute_genre_overlap(["trap"], user_weights) == 0.0
+
+    def test_shared_index_memoizes_genre_lists(self):
+        """Identical genre lists should be scored once per genre index."""
+        from candidate_expander import build_genre_index
+        user_weights = {"indie rock": 0.4, "rock": 0.2}
+        index = build_genre_index(user_weights)
+        first = _compute_genre_overlap(["indie rock", "shoegaze"], user_weights, index)
+        second = _compute_genre_overlap(["indie rock", "shoegaze"], user_weights, index)
+        assert first == second == _compute_genre_overlap(["indie rock", "shoegaze"], user_weights)
+        assert list(index.overlaps) == [("indie rock", "shoegaze")]
+
 
 # =========================================================================
 # CONFIGURATION TESTS
@@ -185,6 +237,11 @@ class TestConfiguration:
         """Popularity gate should exclude very popular artists."""
         assert MAX_POPULARITY_GATE <= 80
 
+    def test_omission_weights_sum_to_one(self):
+        """Omission weights should form a convex combination."""
+        assert sum(OMISSION_WEIGHTS) == pytest.approx(1.0)
+        assert OMISSION_WEIGHTS.contextual_similarity == max(OMISSION_WEIGHTS)
+
 
 # =========================================================================
 # EXPLANATION GENERATION TESTS
@@ -233,6 +290,30 @@ class TestExplanationGeneration:
         )
         assert "2" in explanation or "recurring" in explanation.lower()
 
+    def test_top_recommendations_explain_only_kept(self):
+        """get_top_recommendations should return the best N, each explained."""
+        from context_builder import UserContext
+        from omission_scorer import get_top_recommendations, score_candidates
+
+        candidates = [
+            CandidateArtist(
+                id=f"c{i}",
+                name=f"Artist {i}",
+                genres=["rock"],
+                popularity=10 + i,
+                source="related_artist",
+                seed_support_count=3,
+                seed_artist_names=["A", "B", "C"],
+                genre_overlap=0.8,
+            )
+            for i in range(8)
+        ]
+        context = UserContext(genre_weights={"rock": 1.0})
+        full = score_candidates(candidates, context, feedback_adjustments={})
+        top = get_top_recommendations(candidates, context, limit=3, feedback_adjustments={})
+        assert [s.candidate.id for s in top] == [s.candidate.id for s in full[:3]]
+        assert all(s.explanation and s.genre_overlap_count == 1 for s in top)
+
 
 # =========================================================================
 # DATABASE TESTS (uses temp file)
@@ -314,6 +395,615 @@ class TestDatabase:
         adjustments = db.get_feedback_adjustments()
         assert adjustments.get("good_artist", 0) > 0  # Positive boost
 
+    def test_feedback_views_refresh_after_writes(self):
+        """Cached adjustments/exclusions should be reused until new feedback arrives."""
+        import database as db
+        db.add_feedback("bad_artist", "reject")
+        first = db.get_excluded_artists()
+        assert db.get_excluded_artists() is first  # served from cache
+        assert "bad_artist" not in first
+
+        db.add_feedback("bad_artist", "reject")
+        assert "bad_artist" in db.get_excluded_artists()
+        assert db.get_feedback_adjustments()["bad_artist"] == -999
+
+    def test_feedback_views_see_other_connections(self):
+        """Writes from another connection (e.g. another worker) should invalidate the cache."""
+        import sqlite3
+        import database as db
+        assert "other_artist" not in db.get_feedback_adjustments()
+
+        other = sqlite3.connect(db.DB_PATH)
+        other.execute("""
+            INSERT INTO feedback (candidate_artist_id, verdict) VALUES ('other_artist', 'accept')
+        """)
+        other.commit()
+        other.close()
+
+        assert db.get_feedback_adjustments()["other_artist"] > 0
+
+    def test_connection_is_reused(self):
+        """Calls should share one connection, and failed writes shouldn't leave a transaction open."""
+        import database as db
+        with db.get_connection() as first:
+            pass
+        assert db.add_like("u1", "a1", "A", ["rock"], 30, None, 0.5) is True
+        assert db.add_like("u1", "a1", "A", ["rock"], 30, None, 0.5) is False  # duplicate
+        with db.get_connection() as second:
+            assert second is first
+            assert not second.in_transaction
+        assert db.is_liked("u1", "a1")
+
+    def test_legacy_likes_are_backfilled(self, tmp_path):
+        """init_db should add genres_json to older likes tables and fill it from genres."""
+        import sqlite3
+        import database as db
+        legacy_path = str(tmp_path / "legacy.db")
+        conn = sqlite3.connect(legacy_path)
+        conn.execute("""
+            CREATE TABLE likes (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id TEXT NOT NULL, artist_id TEXT NOT NULL, artist_name TEXT,
+                genres TEXT, popularity INTEGER, source_genre TEXT,
+                omission_score REAL, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE(user_id, artist_id)
+            )
+        """)
+        conn.execute("INSERT INTO likes (user_id, artist_id, genres) VALUES ('u1', 'a1', 'rock,indie rock')")
+        conn.commit()
+        conn.close()
+
+        db.DB_PATH = legacy_path
+        db.init_db()
+        assert db.get_like_stats("u1")["top_genres"] == [("indie rock", 1), ("rock", 1)]
+
+    def test_bulk_inserts(self):
+        """Bulk helpers should save valid rows in one go and skip duplicates/invalid verdicts."""
+        import database as db
+        added = db.add_likes_bulk([
+            ("u1", "a1", "A", ["rock"], 20, None, 0.5),
+            ("u1", "a2", "B", ["jazz"], 40, "jazz", 0.7),
+            ("u1", "a1", "A", ["rock"], 20, None, 0.5),  # duplicate
+        ])
+        assert added == 2
+        assert {like["artist_id"] for like in db.get_user_likes("u1")} == {"a1", "a2"}
+
+        saved = db.add_feedback_bulk([
+            ("bad_artist", "reject", ["s1"], 0.4, None),
+            ("bad_artist", "reject", None, None, None),
+            ("other", "maybe", None, None, None),
+        ])
+        assert saved == 2
+        assert "bad_artist" in db.get_excluded_artists()
+
+    def test_like_stats_top_genres(self):
+        """Genres should be split and counted across likes, most common first."""
+        import database as db
+        db.add_like("u1", "a1", "A", ["rock", "indie rock"], 20, None, 0.5)
+        db.add_like("u1", "a2", "B", ["indie rock", "jazz"], 40, None, 0.7)
+        db.add_like("u1", "a3", "C", [], 60, None, 0.6)
+        db.add_like("u2", "a4", "D", ["jazz"], 50, None, 0.5)
+
+        stats = db.get_like_stats("u1")
+        assert stats["total_likes"] == 3
+        assert stats["avg_popularity"] == 40.0
+        assert stats["top_genres"] == [("indie rock", 2), ("jazz", 1), ("rock", 1)]
+
+
+# =========================================================================
+# RESPONSE CACHE TESTS (uses temp file)
+# =========================================================================
+
+class TestResponseCache:
+    """Test the Spotify catalog response cache."""
+
+    @pytest.fixture(autouse=True)
+    def setup_temp_cache(self, tmp_path):
+        """Setup temporary cache database for each test."""
+        import cache
+        self.original_cache_path = cache.CACHE_PATH
+        cache.CACHE_PATH = str(tmp_path / "cache.db")
+        cache.init_cache()
+        yield
+        cache.CACHE_PATH = self.original_cache_path
+
+    def test_cached_method_hits_once(self):
+        """Repeat calls with the same arguments should skip the wrapped method."""
+        import asyncio
+        from cache import cached
+
+        class FakeClient:
+            calls = 0
+
+            @cached(ttl=60)
+            async def get_related_artists(self, artist_id):
+                FakeClient.calls += 1
+                return {"artists": [{"id": artist_id}]}
+
+        client = FakeClient()
+        first = asyncio.run(client.get_related_artists("a1"))
+        second = asyncio.run(client.get_related_artists("a1"))
+        asyncio.run(client.get_related_artists("a2"))
+
+        assert first == second == {"artists": [{"id": "a1"}]}
+        assert FakeClient.calls == 2
+
+    def test_expired_entry_is_ignored(self):
+        """Entries past their TTL should read as missing."""
+        import cache
+        cache.set_cached("k", {"v": 1}, ttl=-1)
+        assert cache.get_cached("k") is None
+
+    def test_table_created_on_first_use(self, tmp_path, monkeypatch):
+        """A fresh cache file needs no init_cache() call before use."""
+        import cache
+        monkeypatch.setattr(cache, "CACHE_PATH", str(tmp_path / "fresh.db"))
+        assert cache.get_cached("k") is None
+        cache.set_cached("k", {"v": 1}, ttl=60)
+        assert cache.get_cached("k") == {"v": 1}
+
+    def test_purge_drops_expired_rows(self):
+        """Expired rows should be deleted, live ones kept."""
+        import cache
+        cache.set_cached("old", {"v": 1}, ttl=-1)
+        cache.set_cached("new", {"v": 2}, ttl=60)
+        cache.purge_expired()
+        with cache.get_connection() as conn:
+            keys = [row[0] for row in conn.execute("SELECT key FROM response_cache")]
+        assert keys == ["new"]
+
+
+# =========================================================================
+# RATE LIMITER TESTS
+# =========================================================================
+
+class TestLeakyBucket:
+    """Test the async leaky-bucket rate limiter."""
+
+    def test_spacing_and_concurrency(self):
+        """Requests should be evenly spaced and never exceed the concurrency cap."""
+        import asyncio
+        import time
+        from rate_limit import LeakyBucket
+
+        async def run():
+            limiter = LeakyBucket(rate=50, per=1.0, concurrency=2)
+            in_flight = 0
+            peak = 0
+
+            async def request():
+                nonlocal in_flight, peak
+                async with limiter:
+                    in_flight += 1
+                    peak = max(peak, in_flight)
+                    await asyncio.sleep(0.01)
+                    in_flight -= 1
+
+            start = time.monotonic()
+            await asyncio.gather(*[request() for _ in range(6)])
+            return time.monotonic() - start, peak
+
+        elapsed, peak = asyncio.run(run())
+        assert peak <= 2
+        assert elapsed >= 5 * (1.0 / 50)  # 6 requests need 5 gaps of 20ms
+
+    def test_shared_across_event_loops(self):
+        """One limiter should keep working when requests wait on it from a new loop."""
+        import asyncio
+        from rate_limit import LeakyBucket
+
+        limiter = LeakyBucket(rate=1000, per=1.0, concurrency=1)
+
+        async def contended():
+            async def request():
+                async with limiter:
+                    await asyncio.sleep(0.001)
+            await asyncio.gather(*[request() for _ in range(3)])
+
+        asyncio.run(contended())
+        asyncio.run(contended())  # used to raise "bound to a different event loop"
+
+
+# =========================================================================
+# SPOTIFY CLIENT TESTS
+# =========================================================================
+
+class TestSpotifyClient:
+    """Test SpotifyClient request handling with an injected HTTP transport."""
+
+    def test_retries_429_with_injected_client(self):
+        """429 responses should be retried (honouring Retry-After) on the injected client."""
+        import asyncio
+        import httpx
+        from spotify_client import SpotifyClient
+
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            if len(calls) < 3:
+                return httpx.Response(429, headers={"Retry-After": "0"})
+            return httpx.Response(200, json={"artists": [{"id": "a1"}]})
+
+        async def run():
+            async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as http:
+                client = SpotifyClient("token", http=http)
+                return await client.get_artists(["a1"])
+
+        assert asyncio.run(run()) == {"artists": [{"id": "a1"}]}
+        assert len(calls) == 3
+        assert calls[0].headers["Authorization"] == "Bearer token"
+
+    def test_long_retry_after_fails_fast(self):
+        """A Retry-After beyond SPOTIFY_MAX_RETRY_DELAY should raise without retrying."""
+        import asyncio
+        import httpx
+        from spotify_client import SpotifyClient
+
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(429, headers={"Retry-After": "60"})
+
+        async def run():
+            async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as http:
+                return await SpotifyClient("token", http=http).get_artist("a1")
+
+        with pytest.raises(httpx.HTTPStatusError):
+            asyncio.run(run())
+        assert len(calls) == 1
+
+    def test_conditional_get_reuses_body_on_304(self):
+        """A stored ETag should be sent back, and a 304 should return the earlier body."""
+        import asyncio
+        import httpx
+        from spotify_client import SpotifyClient
+
+        seen_etags = []
+
+        def handler(request):
+            seen_etags.append(request.headers.get("If-None-Match"))
+            if request.headers.get("If-None-Match") == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(200, json={"items": [{"id": "a1"}]}, headers={"ETag": '"v1"'})
+
+        async def run():
+            async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as http:
+                client = SpotifyClient("etag-token", http=http)
+                first = await client.get_top_artists("short_term", 50)
+                second = await client.get_top_artists("short_term", 50)
+                return first, second
+
+        first, second = asyncio.run(run())
+        assert first == second == {"items": [{"id": "a1"}]}
+        assert second is not first  # callers can't corrupt the stored copy
+        assert seen_etags == [None, '"v1"']
+
+    def test_etag_store_bounded_by_bytes(self, monkeypatch):
+        """Oldest bodies should be evicted once the stored bytes exceed the budget."""
+        import spotify_client
+        monkeypatch.setattr(spotify_client, "_etags", {})
+        monkeypatch.setattr(spotify_client, "_etag_bytes", 0)
+        monkeypatch.setattr(spotify_client, "SPOTIFY_ETAG_CACHE_BYTES", 10)
+
+        spotify_client._store_etag("a", '"1"', b"12345")
+        spotify_client._store_etag("b", '"1"', b"12345")
+        spotify_client._store_etag("a", '"2"', b"1234")  # replaces, doesn't add
+        assert list(spotify_client._etags) == ["b", "a"]
+        spotify_client._store_etag("c", '"1"', b"12")
+        assert list(spotify_client._etags) == ["a", "c"]
+        assert spotify_client._etag_bytes == 6
+
+
+# =========================================================================
+# CONTEXT BUILDER TESTS
+# =========================================================================
+
+class TestBuildUserContext:
+    """Test longitudinal context building against a fake Spotify client."""
+
+    def test_all_windows_fetched_concurrently(self):
+        """The "all" range should fetch every window at once and merge them."""
+        import asyncio
+        from context_builder import build_user_context
+
+        class FakeClient:
+            in_flight = 0
+            peak = 0
+
+            async def _request(self, payload):
+                FakeClient.in_flight += 1
+                FakeClient.peak = max(FakeClient.peak, FakeClient.in_flight)
+                await asyncio.sleep(0.01)
+                FakeClient.in_flight -= 1
+                return payload
+
+            async def get_top_artists(self, time_range, limit):
+                ids = {"short_term": ["a", "b"], "medium_term": ["a"], "long_term": ["c"]}
+                items = [{"id": i, "name": i, "genres": ["rock"]} for i in ids[time_range]]
+                return await self._request({"items": items})
+
+            async def get_top_tracks(self, time_range, limit):
+                return await self._request({"items": [{"id": f"t-{time_range}"}]})
+
+            async def get_audio_features(self, track_ids):
+                return await self._request({"audio_features": []})
+
+        context = asyncio.run(build_user_context(FakeClient(), "all"))
+
+        assert FakeClient.peak == 6
+        assert context.recurring_artist_ids == ["a"]
+        assert context.known_artist_ids == {"a", "b", "c"}
+        assert len(context.known_track_ids) == 3
+
+    def test_top_genres_sorted_once(self):
+        """top_genres should return the heaviest genres first, for any cutoff."""
+        from context_builder import UserContext
+        context = UserContext(genre_weights={"jazz": 0.2, "rock": 1.0, "pop": 0.5, "folk": 0.5})
+        assert context.top_genres(3) == [("rock", 1.0), ("pop", 0.5), ("folk", 0.5)]
+        assert context.top_genres(1) == [("rock", 1.0)]
+
+    def test_diagnosis_summary(self):
+        """diagnosis_summary should name counts and the top 3 genres."""
+        from context_builder import UserContext
+        context = UserContext(
+            recurring_artist_ids=["a1"],
+            genre_weights={"jazz": 0.2, "rock": 1.0, "pop": 0.5, "folk": 0.4},
+        )
+        summary = context.diagnosis_summary()
+        assert summary == "Based on 0 artists, 1 recurring. Top genres: rock, pop, folk."
+        assert context.diagnosis_summary() is summary
+
+    def test_audio_features_skipped_after_403(self, monkeypatch):
+        """A 403 from audio features should stop later builds from requesting them."""
+        import asyncio
+        import httpx
+        import context_builder
+        monkeypatch.setattr(context_builder, "_audio_features_disabled", False)
+
+        class FakeClient:
+            audio_calls = 0
+
+            async def get_top_artists(self, time_range, limit):
+                return {"items": []}
+
+            async def get_top_tracks(self, time_range, limit):
+                return {"items": [{"id": f"t{i}"} for i in range(limit)]}
+
+            async def get_audio_features(self, track_ids):
+                FakeClient.audio_calls += 1
+                request = httpx.Request("GET", "https://api.spotify.com/v1/audio-features")
+                response = httpx.Response(403, request=request)
+                raise httpx.HTTPStatusError("Forbidden", request=request, response=response)
+
+        context = asyncio.run(context_builder.build_user_context(FakeClient(), "short"))
+        asyncio.run(context_builder.build_user_context(FakeClient(), "short"))
+
+        assert context.audio_profile == context_builder.AudioFeatureProfile()
+        assert FakeClient.audio_calls == 1
+
+    def test_get_user_context_reuses_recent_build(self):
+        """Repeat requests for the same token should share one build until invalidated."""
+        import asyncio
+        from context_builder import get_user_context, invalidate_user_context
+
+        class FakeClient:
+            access_token = "token-reuse-test"
+            builds = 0
+
+            async def get_top_artists(self, time_range, limit):
+                FakeClient.builds += 1
+                await asyncio.sleep(0.01)
+                return {"items": [{"id": "a", "name": "A", "genres": []}]}
+
+            async def get_top_tracks(self, time_range, limit):
+                return {"items": []}
+
+        async def run():
+            client = FakeClient()
+            first, second = await asyncio.gather(
+                get_user_context(client, "short"),
+                get_user_context(client, "short"),
+            )
+            invalidate_user_context(client.access_token)
+            third = await get_user_context(client, "short")
+            return first, second, third
+
+        first, second, third = asyncio.run(run())
+        assert first is second
+        assert third is not first
+        assert FakeClient.builds == 2
+
+    def test_context_locks_released_after_failed_build(self):
+        """Build locks shouldn't outlive their requests, even when the build fails."""
+        import asyncio
+        import context_builder
+
+        class FailingClient:
+            access_token = "token-failing-build"
+
+            async def get_top_artists(self, time_range, limit):
+                await asyncio.sleep(0.01)
+                raise RuntimeError("spotify down")
+
+            async def get_top_tracks(self, time_range, limit):
+                return {"items": []}
+
+        async def run():
+            client = FailingClient()
+            return await asyncio.gather(
+                context_builder.get_user_context(client, "short"),
+                context_builder.get_user_context(client, "short"),
+                return_exceptions=True,
+            )
+
+        results = asyncio.run(run())
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert context_builder._context_locks == {}
+
+
+class TestResponses:
+    """Tests for the hand-built endpoint responses."""
+
+    def test_matches_response_model(self):
+        """The dicts /scan returns should validate as OmissionScanResponse."""
+        import orjson
+        from context_builder import UserContext
+        from main import OmissionScanResponse, _scan_response
+
+        result = {
+            "artist_id": "x1",
+            "artist_name": "X",
+            "sample_track_name": None,
+            "genres": ["ambient"],
+            "omission_score": 0.612,
+            "explanation": "Related to 2 of your recurring artists, yet absent from your library.",
+            "evidence": {
+                "seed_artists": ["A", "B"],
+                "genre_overlap_count": 1,
+                "audio_similarity_score": 0.0,
+                "popularity": 20,
+                "earliest_album_year": None,
+            },
+        }
+        response = _scan_response([result], UserContext(genre_weights={"ambient": 1.0}), 7)
+        body = orjson.loads(response.body)
+        parsed = OmissionScanResponse.model_validate(body)
+        assert parsed.model_dump() == body
+        assert body["candidates_evaluated"] == 7
+
+    def test_diagnosis_matches_response_model(self):
+        """The dicts /diagnosis returns should validate as DiagnosisResponse."""
+        import orjson
+        from context_builder import ArtistContext, UserContext
+        from main import DiagnosisResponse, _diagnosis_response
+
+        artist = ArtistContext(
+            id="a1", name="A", genres=["ambient"], popularity=40,
+            in_short_term=True, in_long_term=True, recurrence_score=2 / 3,
+        )
+        context = UserContext(
+            artists={"a1": artist},
+            recurring_artist_ids=["a1"],
+            genre_weights={"ambient": 1.0},
+            known_track_ids={"t1", "t2"},
+        )
+        body = orjson.loads(_diagnosis_response(context).body)
+        assert DiagnosisResponse.model_validate(body).model_dump() == body
+        assert body["audio_feature_profile"]["tempo"] == {"center": 120.0}
+        assert body["notes"][:2] == [
+            "Your listening clusters around: ambient.",
+            "Your most stable recurring artists: A.",
+        ]
+
+
+# =========================================================================
+# SHARED SOURCE SESSION TESTS
+# =========================================================================
+
+class TestSourceSessions:
+    """Tests for the pooled HTTP session shared by the source scrapers."""
+
+    def test_session_per_loop_without_cookies(self):
+        """A new event loop gets a new session; the old one is closed."""
+        import asyncio
+        import aiohttp
+        from sources import http
+
+        first = asyncio.run(http.get_session())
+        second = asyncio.run(http.get_session())
+        assert second is not first
+        assert first.closed
+        assert isinstance(second.cookie_jar, aiohttp.DummyCookieJar)
+        asyncio.run(http.close_session())
+        assert second.closed
+
+    def test_mixcloud_search_on_shared_session(self, monkeypatch):
+        """A scraper should parse results fetched through the shared session."""
+        import asyncio
+        from sources import mixcloud
+
+        requests = []
+
+        class FakeResponse:
+            status = 200
+
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc):
+                return False
+
+            async def json(self):
+                return {"data": [
+                    {
+                        "key": "/dj/deep-set/",
+                        "name": "Deep Set",
+                        "user": {"username": "dj"},
+                        "pictures": {"medium": "https://img/m.jpg"},
+                        "tags": [{"name": "house"}],
+                        "play_count": 42,
+                        "audio_length": 3600,
+                    },
+                    {"name": "No key - skipped"},
+                ]}
+
+        class FakeSession:
+            def get(self, url, **kwargs):
+                requests.append((url, kwargs["params"]))
+                return FakeResponse()
+
+        async def fake_get_session():
+            return FakeSession()
+
+        monkeypatch.setattr(mixcloud, "get_session", fake_get_session)
+        tracks = asyncio.run(mixcloud.search_mixcloud("house", limit=5))
+
+        assert requests == [(
+            "https://api.mixcloud.com/search/",
+            {"q": "house", "type": "cloudcast", "limit": 5},
+        )]
+        assert len(tracks) == 1
+        track = tracks[0]
+        assert track.id == "mixcloud__dj_deep-set_"
+        assert (track.artist, track.plays, track.genre) == ("dj", 42, "house")
+        assert track.artwork_url == "https://img/m.jpg"
+        assert track.url == "https://www.mixcloud.com/dj/deep-set/"
+
+
+# =========================================================================
+# ARCHIVE.ORG SOURCE TESTS
+# =========================================================================
+
+class TestArchiveOrg:
+    """Tests for the Internet Archive source."""
+
+    def test_underground_filter_keeps_items_without_downloads(self, monkeypatch):
+        """The download range is queried server-side, and docs with no count survive."""
+        import asyncio
+        import httpx
+        from sources import archive_org, http
+
+        queries = []
+
+        def handler(request):
+            queries.append(request.url.params["q"])
+            return httpx.Response(200, json={"response": {"docs": [
+                {"identifier": "played", "title": "Played", "downloads": 500},
+                {"identifier": "uncounted", "title": "Uncounted"},
+            ]}})
+
+        async def fake_client():
+            return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+        monkeypatch.setattr(archive_org, "get_client", fake_client)
+        tracks = asyncio.run(archive_org.get_underground_by_genre("dub", limit=5))
+
+        assert "((*:* -downloads:*) OR downloads:[0 TO 999])" in queries[0]
+        assert [t.id for t in tracks] == ["archive_uncounted", "archive_played"]
+        assert tracks[0].downloads == 0
+
 
 # =========================================================================
 # RUN TESTS